@@ -0,0 +1,42 @@
+"""add hnsw indexes to face embeddings
+
+Revision ID: 5d1c2a7e9f40
+Revises: c9e60285f45e
+Create Date: 2026-10-18 10:12:31.508214
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1c2a7e9f40"
+down_revision: str | None = "c9e60285f45e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+EMBEDDING_COLUMNS = (
+    "center_embedding",
+    "left_embedding",
+    "right_embedding",
+)
+
+
+def upgrade() -> None:
+    # the index on the single embedding column was dropped together with the
+    # column in c9e60285f45e
+    for column in EMBEDDING_COLUMNS:
+        op.create_index(
+            f"ix_face_{column}_hnsw",
+            "face",
+            [column],
+            postgresql_using="hnsw",
+            postgresql_ops={column: "vector_l2_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in EMBEDDING_COLUMNS:
+        op.drop_index(f"ix_face_{column}_hnsw", table_name="face")
@@ -0,0 +1,36 @@
+"""add keyset pagination indexes
+
+Revision ID: 7b3e9d4f1a62
+Revises: 5d1c2a7e9f40
+Create Date: 2026-10-18 14:03:12.771402
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b3e9d4f1a62"
+down_revision: str | None = "5d1c2a7e9f40"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# filter columns followed by the (created_at, key) pagination key, see
+# app.crud.pagination
+INDEXES = {
+    "project": ["owner_id", "created_at", "id"],
+    "trusted_origin": ["owner_id", "project_id", "created_at", "id"],
+    "user_project_link": ["owner_id", "created_at", "project_id"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in INDEXES.items():
+        op.create_index(f"ix_{table}_{'_'.join(columns)}", table, columns)
+
+
+def downgrade() -> None:
+    for table, columns in INDEXES.items():
+        op.drop_index(f"ix_{table}_{'_'.join(columns)}", table_name=table)
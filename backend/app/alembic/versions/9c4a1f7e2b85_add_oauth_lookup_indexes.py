@@ -0,0 +1,72 @@
+"""add oauth lookup indexes
+
+Revision ID: 9c4a1f7e2b85
+Revises: 7b3e9d4f1a62
+Create Date: 2026-10-18 15:21:44.183095
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4a1f7e2b85"
+down_revision: str | None = "7b3e9d4f1a62"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# oauth_refresh_token.token already has the index of its unique constraint
+# and user_project_link lookups by (owner_id, project_id) use the primary
+# key index
+def upgrade() -> None:
+    # Duplicates would make the unique indexes fail. An auth code shared by
+    # several rows can not be told apart, so none of them is redeemable:
+    # they are all dropped, users sign in again. Duplicated trusted
+    # origins are equivalent, the oldest one is kept.
+    op.execute(
+        """
+        DELETE FROM oauth.auth_code
+        WHERE code IN (
+            SELECT code FROM oauth.auth_code
+            GROUP BY code
+            HAVING count(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM trusted_origin
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY name, project_id
+                    ORDER BY created_at, id
+                ) AS position
+                FROM trusted_origin
+            ) AS ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.create_index(
+        "ix_auth_code_code",
+        "auth_code",
+        ["code"],
+        unique=True,
+        schema="oauth",
+    )
+    op.create_index(
+        "ix_trusted_origin_name_project_id",
+        "trusted_origin",
+        ["name", "project_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_trusted_origin_name_project_id", table_name="trusted_origin"
+    )
+    op.drop_index("ix_auth_code_code", table_name="auth_code", schema="oauth")
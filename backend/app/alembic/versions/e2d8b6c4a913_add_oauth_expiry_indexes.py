@@ -0,0 +1,56 @@
+"""add oauth expiry indexes
+
+Revision ID: e2d8b6c4a913
+Revises: 9c4a1f7e2b85
+Create Date: 2026-10-18 16:48:09.552310
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2d8b6c4a913"
+down_revision: str | None = "9c4a1f7e2b85"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# age predicates of app.core.reaper
+def upgrade() -> None:
+    op.create_index(
+        "ix_auth_code_created_at",
+        "auth_code",
+        ["created_at"],
+        schema="oauth",
+    )
+    op.create_index(
+        "ix_oauth_refresh_token_created_at",
+        "oauth_refresh_token",
+        ["created_at"],
+        schema="oauth",
+    )
+    op.create_index(
+        "ix_oauth_session_last_refresh",
+        "oauth_session",
+        [sa.text("coalesce(refreshed_at, created_at)")],
+        schema="oauth",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_oauth_session_last_refresh",
+        table_name="oauth_session",
+        schema="oauth",
+    )
+    op.drop_index(
+        "ix_oauth_refresh_token_created_at",
+        table_name="oauth_refresh_token",
+        schema="oauth",
+    )
+    op.drop_index(
+        "ix_auth_code_created_at", table_name="auth_code", schema="oauth"
+    )
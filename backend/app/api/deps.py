@@ -2,12 +2,16 @@ from typing import Annotated
 
 from fastapi import Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.auth import get_current_user
-from app.core.db import get_db
+from app.core.auth import get_current_user, get_remote_user
+from app.core.db import get_async_db, get_db
 from app.schemas.auth import UserIn
 
 CurrentUser = Annotated[UserIn, Depends(get_current_user)]
+# checked with Supabase even when tokens are verified locally
+RemoteCurrentUser = Annotated[UserIn, Depends(get_remote_user)]
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
@@ -3,18 +3,20 @@ from datetime import UTC, datetime, timedelta
 from fastapi import APIRouter, HTTPException, Request
 
 from app.api.deps import SessionDep
+from app.core.config import settings
 from app.core.db import generate_oauth_token, refresh_oauth_token
 from app.crud import (
     auth_code,
     oauth_refresh_token,
     oauth_session,
-    project,
     trusted_origin,
 )
+from app.crud.crud_trusted_origin import OriginCheck
 from app.models.oauth_session import OAuthSession, OAuthSessionCreate
 from app.schemas import OAuthTokenRequest
 from app.schemas.auth import OAuthToken, RefreshTokenRequest
 from app.utils import sha256_base64url_encode
+from app.utils.errors import InvalidRefreshToken
 
 router = APIRouter(prefix="/oauth", tags=["oauth"])
 
@@ -27,20 +29,18 @@ async def create_session(
     oauth_session_in: OAuthSessionCreate,
     session: SessionDep,
 ) -> OAuthSession:
-    # check if project exists
-    project_obj = project.get(session, id=oauth_session_in.project_id)
-    if project_obj is None:
-        raise HTTPException(status_code=400, detail="Invalid project id")
-
     request_origin = request.headers.get("origin")
-    if request_origin is None:
-        raise HTTPException(status_code=400, detail="Missing origin header")
-    trusted_origin_obj = trusted_origin.get_by_name_and_project(
+    # check that the project exists and trusts the origin
+    check = trusted_origin.check_origin(
         session,
-        name=request_origin,
         project_id=oauth_session_in.project_id,
+        origin=request_origin or "",
     )
-    if trusted_origin_obj is None:
+    if check is OriginCheck.INVALID_PROJECT:
+        raise HTTPException(status_code=400, detail="Invalid project id")
+    if request_origin is None:
+        raise HTTPException(status_code=400, detail="Missing origin header")
+    if check is OriginCheck.INVALID_ORIGIN:
         raise HTTPException(status_code=400, detail="Invalid origin")
 
     oauth_session_obj = oauth_session.create(session, obj_in=oauth_session_in)
@@ -63,7 +63,9 @@ async def get_token(
         raise HTTPException(status_code=400, detail="Invalid code")
 
     created_at = code_obj.created_at
-    if created_at < datetime.now(UTC) - timedelta(minutes=5):
+    if created_at < datetime.now(UTC) - timedelta(
+        seconds=settings.AUTH_CODE_LIFESPAN
+    ):
         raise HTTPException(status_code=400, detail="Code expired")
 
     code_verifier = token_request.code_verifier
@@ -74,8 +76,12 @@ async def get_token(
     if verifier_hash != code_challenge:
         raise HTTPException(status_code=400, detail="Invalid code verifier")
 
-    # delete the code
-    auth_code.remove(session, id=code_obj.id)
+    # delete the code, committed together with the issued token. Of
+    # concurrent requests with the same code only the one that deletes it
+    # gets a token
+    if auth_code.remove(session, id=code_obj.id, commit=False) is None:
+        session.rollback()
+        raise HTTPException(status_code=400, detail="Invalid code")
 
     oauth_token = generate_oauth_token(
         session,
@@ -105,11 +111,15 @@ async def refresh_token(
         session, id=refresh_token_obj.oauth_session_id
     )
 
-    oauth_token = refresh_oauth_token(
-        session,
-        refresh_token_obj,
-        oauth_session_obj,
-    )
+    try:
+        oauth_token = refresh_oauth_token(
+            session,
+            refresh_token_obj,
+            oauth_session_obj,
+        )
+    except InvalidRefreshToken:
+        # already used by a concurrent refresh
+        raise HTTPException(status_code=400, detail="Invalid refresh token")
 
     return oauth_token
 
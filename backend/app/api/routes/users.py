@@ -1,9 +1,12 @@
 import logging
+from uuid import UUID
 
 from fastapi import APIRouter
 
-from app.api.deps import CurrentUser
+from app.api.deps import CurrentUser, RemoteCurrentUser
 from app.core.auth import SuperClient
+from app.core.face_index import face_index
+from app.core.security import invalidate_user_data
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -27,7 +30,7 @@ async def get_me(
 
 @router.delete("/me")
 async def delete_me(
-    current_user: CurrentUser,
+    current_user: RemoteCurrentUser,
     super_client: SuperClient,
 ) -> dict[str, str]:
     """
@@ -37,6 +40,9 @@ async def delete_me(
     using Supabase's admin delete user functionality.
     """
     await super_client.auth.admin.delete_user(current_user.id)
+    # faces are removed by the foreign key cascade, drop the local copies
+    face_index.remove_owner(UUID(current_user.id))
+    invalidate_user_data(current_user.id)
     logger.info(f"Successfully deleted user {current_user.id}")
 
     return {"message": "User account deleted successfully"}
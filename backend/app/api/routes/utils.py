@@ -1,8 +1,32 @@
+from typing import Any
+
 from fastapi import APIRouter
 
+from app.core.db import pool_metrics
+from app.core.face_index import face_index
+from app.core.frame_admission import frame_admission
+from app.core.inference import embedding_batcher, inference_executor
+from app.core.reaper import reaper
+from app.core.security import user_data_cache_stats
+from app.crud import trusted_origin
+
 router = APIRouter(prefix="/utils", tags=["utils"])
 
 
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/metrics/")
+async def metrics() -> dict[str, Any]:
+    return {
+        "inference": inference_executor.stats(),
+        "embedding_batches": embedding_batcher.stats(),
+        "stream_admission": frame_admission.stats(),
+        "face_index": face_index.stats(),
+        "db_pool": pool_metrics(),
+        "user_data_cache": user_data_cache_stats(),
+        "reaper": reaper.stats(),
+        "trusted_origin_cache": trusted_origin.cache_stats(),
+    }
@@ -5,11 +5,15 @@ from uuid import UUID
 
 import socketio  # type: ignore
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlmodel import Session
+from numpy import ndarray
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.auth import get_async_super_client, get_current_user
 from app.core.config import settings
-from app.core.db import generate_supabase_session, get_db
+from app.core.db import async_session_scope, generate_supabase_session
+from app.core.frame_admission import Admission, frame_admission
+from app.core.inference import embedding_batcher, inference_executor
+from app.core.socket_io import InMemorySessionStore, SessionStore
 from app.crud import (
     auth_code,
     face,
@@ -18,12 +22,18 @@ from app.crud import (
     user_project_link,
 )
 from app.models.auth_code import AuthCodeCreate
-from app.models.face import FaceCreate, FaceOrientation
+from app.models.face import FaceCreate, FaceMatch, FaceOrientation
 from app.models.user_project_link import UserProjectLinkCreate
 from app.schemas.auth import AuthTypes, SioUserSession
 from app.utils import generate_auth_code
-from app.utils.detection import extract_largest_face, parse_frame
-from app.utils.errors import FaceSpoofingDetected
+from app.utils.antispoofing.buffer import LivenessFrameBuffer
+from app.utils.antispoofing.inference import infer_liveness, preprocess_frame
+from app.utils.detection import decode_frame, extract_largest_face
+from app.utils.errors import (
+    FaceSpoofingDetected,
+    InferenceQueueFull,
+    InferenceTimeout,
+)
 
 logger = logging.getLogger("uvicorn")
 
@@ -37,9 +47,21 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
     - Face registration
     """
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        """Initialize the authentication namespace."""
+    def __init__(
+        self,
+        *args: Any,
+        session_store: SessionStore | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the authentication namespace.
+
+        Args:
+            session_store: Keeps the connection states, in process when None
+        """
         super().__init__(*args, **kwargs)
+        self.sessions: SessionStore = session_store or InMemorySessionStore()
+        # kept out of the Socket.IO session so frames are never serialized
+        self.liveness_buffers: dict[str, LivenessFrameBuffer] = {}
 
     async def emit_error(
         self, sid: str, error: str, disconnect: bool = False
@@ -86,7 +108,7 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
                 )
             ).id
 
-        await self.save_session(
+        await self.sessions.save(
             sid,
             SioUserSession(
                 user_id=user_id,
@@ -123,18 +145,59 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
                 await self.emit_error(sid, "Invalid oauth_session_id")
                 return
 
-        async with self.session(sid) as session:
-            session.oauth_session_uuid = oauth_session_uuid
-            session.auth_type = auth_type
-            session.code_challenge = data.get("code_challenge")
-            session.pending_oauth = True
+        if (user_session := await self.sessions.get(sid)) is None:
+            return
+
+        code_challenge = data.get("code_challenge")
+        # everything that does not change between frames is checked here,
+        # frames are only embedded and matched
+        project_id = None
+        match auth_type:
+            case AuthTypes.LOGIN:
+                if not (origin := user_session.origin):
+                    await self.emit_error(
+                        sid, "Missing origin", disconnect=True
+                    )
+                    return
+                if not settings.is_trusted_login_origin(origin):
+                    await self.emit_error(
+                        sid, "Invalid origin", disconnect=True
+                    )
+                    return
+            case AuthTypes.OAUTH:
+                if not code_challenge:
+                    await self.emit_error(sid, "Missing code_challenge")
+                    return
+                if not oauth_session_uuid:
+                    await self.emit_error(sid, "Missing oauth_session_id")
+                    return
+                async with async_session_scope() as db_session:
+                    oauth_session_obj = await oauth_session.aget(
+                        session=db_session,
+                        id=oauth_session_uuid,
+                    )
+                if not oauth_session_obj:
+                    await self.emit_error(sid, "Invalid oauth_session_id")
+                    return
+                project_id = oauth_session_obj.project_id
+
+        user_session.oauth_session_uuid = oauth_session_uuid
+        user_session.project_id = project_id
+        user_session.auth_type = auth_type
+        user_session.code_challenge = code_challenge
+        user_session.pending_oauth = True
+        await self.sessions.save(sid, user_session)
+        # frames of a previous attempt do not count towards this one
+        if (buffer := self.liveness_buffers.get(sid)) is not None:
+            buffer.reset()
 
         await self.emit("auth_started", room=sid)
 
     async def _handle_register(
         self,
         sid: str,
-        db_session: Session,
+        db_session: AsyncSession,
+        user_session: SioUserSession,
         face_embedding: list[float],
         face_orientation: FaceOrientation,
     ) -> None:
@@ -143,124 +206,109 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
         Args:
             sid: Session ID of the client
             db_session: Database session
+            user_session: User session data
             face_embedding: Face embedding vector
         """
-        try:
-            async with self.session(sid) as session:
-                if not (session_user_id := session.user_id):
-                    await self.emit_error(
-                        sid, "Not authenticated", disconnect=True
-                    )
-                    return
+        if not (session_user_id := user_session.user_id):
+            await self.emit_error(sid, "Not authenticated", disconnect=True)
+            return
 
-                if session.face_data is None:
-                    if face_orientation != FaceOrientation.CENTER:
-                        await self.emit(
-                            "set_orientation",
-                            FaceOrientation.CENTER.value,
-                            room=sid,
-                        )
-                        return
-
-                    session.face_data = FaceCreate(
-                        center_embedding=face_embedding,
-                        left_embedding=None,
-                        right_embedding=None,
-                    )
-                    await self.emit(
-                        "set_orientation",
-                        FaceOrientation.RIGHT.value,
-                        room=sid,
-                    )
-                    return
+        if user_session.face_data is None:
+            if face_orientation != FaceOrientation.CENTER:
+                await self.emit(
+                    "set_orientation",
+                    FaceOrientation.CENTER.value,
+                    room=sid,
+                )
+                return
 
-                if session.face_data.right_embedding is None:
-                    if face_orientation != FaceOrientation.RIGHT:
-                        await self.emit(
-                            "set_orientation",
-                            FaceOrientation.RIGHT.value,
-                            room=sid,
-                        )
-                        return
-
-                    session.face_data.right_embedding = face_embedding
-                    await self.emit(
-                        "set_orientation",
-                        FaceOrientation.LEFT.value,
-                        room=sid,
-                    )
-                    return
+            user_session.face_data = FaceCreate(
+                center_embedding=face_embedding,
+                left_embedding=None,
+                right_embedding=None,
+            )
+            await self.sessions.save(sid, user_session)
+            await self.emit(
+                "set_orientation",
+                FaceOrientation.RIGHT.value,
+                room=sid,
+            )
+            return
 
-                if session.face_data.left_embedding is None:
-                    if face_orientation != FaceOrientation.LEFT:
-                        await self.emit(
-                            "set_orientation",
-                            FaceOrientation.LEFT.value,
-                            room=sid,
-                        )
-                        return
-
-                    session.face_data.left_embedding = face_embedding
-
-                face.create(
-                    session=db_session,
-                    owner_id=UUID(session_user_id),
-                    obj_in=session.face_data,
+        if user_session.face_data.right_embedding is None:
+            if face_orientation != FaceOrientation.RIGHT:
+                await self.emit(
+                    "set_orientation",
+                    FaceOrientation.RIGHT.value,
+                    room=sid,
                 )
+                return
+
+            user_session.face_data.right_embedding = face_embedding
+            await self.sessions.save(sid, user_session)
+            await self.emit(
+                "set_orientation",
+                FaceOrientation.LEFT.value,
+                room=sid,
+            )
+            return
 
+        if user_session.face_data.left_embedding is None:
+            if face_orientation != FaceOrientation.LEFT:
                 await self.emit(
-                    "auth_success",
-                    {"user_id": session_user_id},
+                    "set_orientation",
+                    FaceOrientation.LEFT.value,
                     room=sid,
                 )
-                await self.disconnect(sid)
-        except KeyError:
-            return
+                return
+
+            user_session.face_data.left_embedding = face_embedding
+
+        await face.acreate(
+            session=db_session,
+            owner_id=UUID(session_user_id),
+            obj_in=user_session.face_data,
+        )
+
+        await self.emit(
+            "auth_success",
+            {"user_id": session_user_id},
+            room=sid,
+        )
+        await self.disconnect(sid)
 
     async def _handle_login(
         self,
         sid: str,
-        db_session: Session,
+        db_session: AsyncSession,
         user_session: SioUserSession,
         face_embedding: list[float],
         face_orientation: FaceOrientation,
     ) -> None:
         """Handle face-based login process.
 
+        The origin was checked by `on_start_auth`.
+
         Args:
             sid: Session ID of the client
             db_session: Database session
             user_session: User session data
             face_embedding: Face embedding vector
         """
-        if not (origin := user_session.origin):
-            await self.emit_error(sid, "Missing origin", disconnect=True)
-            return
-
-        if origin.rstrip("/") not in settings.all_trusted_login_origins:
-            await self.emit_error(sid, "Invalid origin", disconnect=True)
-            return
-
-        if face_orientation != user_session.random_orientation:
-            await self.emit(
-                "set_orientation",
-                user_session.random_orientation.value,
-                room=sid,
-            )
-            return
-
         if not (
-            match := face.face_match(
-                session=db_session,
-                embedding=face_embedding,
-                face_orientation=face_orientation,
-                threshold=settings.FACE_MATCH_THRESHOLD,
+            match := await self._match_face(
+                sid,
+                db_session,
+                user_session,
+                face_embedding,
+                face_orientation,
             )
         ):
-            await self.emit_error(sid, "Face not recognized")
             return
 
-        session_data = generate_supabase_session(match.owner_id)
+        session_data = await generate_supabase_session(
+            db_session, match.owner_id
+        )
         await self.emit(
             "auth_success",
             session_data.model_dump(),
@@ -271,72 +319,56 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
     async def _handle_oauth(
         self,
         sid: str,
-        db_session: Session,
+        db_session: AsyncSession,
         user_session: SioUserSession,
         face_embedding: list[float],
         face_orientation: FaceOrientation,
     ) -> None:
         """Handle OAuth authentication process.
 
+        The code challenge and the OAuth session's project were resolved by
+        `on_start_auth`.
+
         Args:
             sid: Session ID of the client
             db_session: Database session
             user_session: User session data
             face_embedding: Face embedding vector
         """
-
-        if not (code_challenge := user_session.code_challenge):
-            await self.emit_error(sid, "Missing code_challenge")
-            return
-
-        if not (oauth_session_id := user_session.oauth_session_uuid):
-            await self.emit_error(sid, "Missing oauth_session_id")
-            return
-
-        if not (
-            oauth_session_obj := oauth_session.get(
-                session=db_session,
-                id=oauth_session_id,
-            )
-        ):
-            await self.emit_error(sid, "Invalid oauth_session_id")
-            return
-
-        if face_orientation != user_session.random_orientation:
-            await self.emit(
-                "set_orientation",
-                user_session.random_orientation.value,
-                room=sid,
+        code_challenge = user_session.code_challenge
+        project_id = user_session.project_id
+        if not code_challenge or project_id is None:
+            await self.emit_error(
+                sid, "Start auth first by calling event 'start_auth'"
             )
             return
 
         if not (
-            match := face.face_match(
-                session=db_session,
-                embedding=face_embedding,
-                face_orientation=face_orientation,
-                threshold=settings.FACE_MATCH_THRESHOLD,
+            match := await self._match_face(
+                sid,
+                db_session,
+                user_session,
+                face_embedding,
+                face_orientation,
             )
         ):
-            await self.emit_error(sid, "Face not recognized")
             return
 
         if not (
-            user_project_link.get(
+            await user_project_link.aget(
                 session=db_session,
                 owner_id=match.owner_id,
-                project_id=oauth_session_obj.project_id,
+                project_id=project_id,
             )
         ):
-            async with self.session(sid) as session:
-                session.user_id = str(match.owner_id)
+            user_session.user_id = str(match.owner_id)
+            await self.sessions.save(sid, user_session)
 
             await self.emit(
                 "capture_consent",
                 {
-                    "project": project.get(
-                        db_session,
-                        id=oauth_session_obj.project_id,
+                    "project": (
+                        await project.aget(db_session, id=project_id)
                     ).model_dump_json(),
                 },
             )
@@ -345,10 +377,10 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
         auth_obj = AuthCodeCreate(
             code=generate_auth_code(),
             code_challenge=code_challenge,
-            project_id=oauth_session_obj.project_id,
+            project_id=project_id,
         )
 
-        auth_code.create(
+        await auth_code.acreate(
             session=db_session,
             owner_id=match.owner_id,
             obj_in=auth_obj,
@@ -360,18 +392,251 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
             room=sid,
         )
 
-    async def on_stream(self, sid: str, data: dict) -> None:
-        """Process video stream frames for authentication.
+    async def _match_face(
+        self,
+        sid: str,
+        db_session: AsyncSession,
+        user_session: SioUserSession,
+        face_embedding: list[float],
+        face_orientation: FaceOrientation,
+    ) -> FaceMatch | None:
+        """Match a login face against the enrolled faces.
+
+        In "single" `FACE_MATCH_MODE` the frame must show the session's
+        random orientation. In "fused" mode embeddings of different
+        orientations are collected in the session until
+        `FACE_MATCH_FUSED_ORIENTATIONS` of them can be matched together.
+
+        Args:
+            sid: Session ID of the client
+            db_session: Database session
+            user_session: User session data
+            face_embedding: Face embedding vector
+            face_orientation: Orientation of the face in the frame
+
+        Returns:
+            The closest match, or None once the next step was emitted
+        """
+        if settings.FACE_MATCH_MODE == "single":
+            if face_orientation != user_session.random_orientation:
+                await self.emit(
+                    "set_orientation",
+                    user_session.random_orientation.value,
+                    room=sid,
+                )
+                return None
+
+            match = await face.aface_match(
+                session=db_session,
+                embedding=face_embedding,
+                face_orientation=face_orientation,
+                threshold=settings.FACE_MATCH_THRESHOLD,
+            )
+        else:
+            captured = user_session.captured_embeddings
+            captured[face_orientation] = face_embedding
+            if len(captured) < min(
+                settings.FACE_MATCH_FUSED_ORIENTATIONS,
+                len(FaceOrientation),
+            ):
+                await self.sessions.save(sid, user_session)
+                await self.emit(
+                    "set_orientation",
+                    next(
+                        orientation
+                        for orientation in FaceOrientation
+                        if orientation not in captured
+                    ).value,
+                    room=sid,
+                )
+                return None
+            # a failed attempt starts over with fresh captures
+            user_session.captured_embeddings = {}
+            await self.sessions.save(sid, user_session)
+
+            matches = await face.aface_match_fused(
+                session=db_session,
+                embeddings=captured,
+                threshold=settings.FACE_MATCH_THRESHOLD,
+            )
+            match = matches[0] if matches else None
+
+        if match is None:
+            await self.emit_error(sid, "Face not recognized")
+        return match
+
+    async def _check_liveness(self, sid: str, frame: ndarray) -> bool:
+        """Feed a frame to the client's rolling liveness window.
+
+        The window is scored every `LIVENESS_STRIDE` frames once it holds
+        `LIVENESS_WINDOW_SIZE` frames, the latest score gates the frames
+        in between.
+
+        Args:
+            sid: Session ID of the client
+            frame: Decoded video frame
+
+        Returns:
+            Whether the latest liveness window passed
+        """
+        if (buffer := self.liveness_buffers.get(sid)) is None:
+            buffer = self.liveness_buffers[sid] = LivenessFrameBuffer(
+                window_size=settings.LIVENESS_WINDOW_SIZE,
+                stride=settings.LIVENESS_STRIDE,
+            )
+
+        if inference_executor.kind == "thread":
+            # the worker writes into the ring slot, no per-frame array
+            await inference_executor.run(
+                "liveness_preprocess",
+                preprocess_frame,
+                frame,
+                out=buffer.slot(),
+                timeout=settings.INFERENCE_DECODE_TIMEOUT,
+            )
+            window = buffer.advance()
+        else:
+            # process workers can not write into this process' memory
+            window = buffer.push(
+                await inference_executor.run(
+                    "liveness_preprocess",
+                    preprocess_frame,
+                    frame,
+                    timeout=settings.INFERENCE_DECODE_TIMEOUT,
+                )
+            )
+
+        if window is not None:
+            buffer.last_score = (
+                await inference_executor.run(
+                    "liveness",
+                    infer_liveness,
+                    window,
+                    timeout=settings.INFERENCE_LIVENESS_TIMEOUT,
+                )
+            )[0]
+
+        if buffer.last_score is None:
+            # window not filled yet
+            return False
+
+        if buffer.last_score < settings.LIVENESS_THRESHOLD:
+            await self.emit_error(sid, "Liveness check failed")
+            return False
+
+        return True
+
+    async def _run_pipeline(
+        self,
+        sid: str,
+        raw_frame: bytes,
+    ) -> list[float] | None:
+        try:
+            frame = await inference_executor.run(
+                "decode",
+                decode_frame,
+                raw_frame,
+                timeout=settings.INFERENCE_DECODE_TIMEOUT,
+            )
+        except ValueError as e:
+            await self.emit_error(sid, str(e))
+            return None
+
+        if settings.LIVENESS_ENABLED and not await self._check_liveness(
+            sid, frame
+        ):
+            return None
+
+        try:
+            largest_face = await inference_executor.run(
+                "detection",
+                extract_largest_face,
+                frame,
+                anti_spoofing=True,
+                timeout=settings.INFERENCE_DETECTION_TIMEOUT,
+            )
+        except FaceSpoofingDetected:
+            await self.emit_error(sid, "Spoofing detected")
+            return None
+
+        if largest_face is None:
+            await self.emit_error(sid, "No valid face detected")
+            return None
+
+        try:
+            return await embedding_batcher.embed(largest_face["face"])
+        except ValueError:
+            await self.emit_error(sid, "No valid face detected")
+            return None
+
+    async def _embed_frame(
+        self,
+        sid: str,
+        raw_frame: bytes,
+    ) -> list[float] | None:
+        """Decode a frame and embed the largest face in it.
+
+        Args:
+            sid: Session ID of the client
+            raw_frame: Encoded image bytes
+
+        Returns:
+            The face embedding, or None once the reason was emitted
+        """
+        try:
+            return await self._run_pipeline(sid, raw_frame)
+        except InferenceQueueFull:
+            await self.emit_error(sid, "Server busy, try again later")
+        except InferenceTimeout:
+            await self.emit_error(sid, "Frame processing timed out")
+        return None
+
+    async def on_stream(self, sid: str, data: dict[str, Any]) -> None:
+        """Admit video stream frames for authentication.
+
+        A client gets one frame processed at a time, the most recent frame
+        received meanwhile is processed next and older ones are dropped.
+        Frames over `STREAM_MAX_FPS` are dropped, the client is told with a
+        `throttled` event.
 
         Args:
             sid: Session ID of the client
             data: Raw video frame data
         """
-        user_session = SioUserSession(
-            **(await self.get_session(sid)).model_dump()
-        )
+        admission = frame_admission.offer(sid, data)
+        if admission in (Admission.RATE_LIMITED, Admission.SUPERSEDED):
+            if frame_admission.should_hint(sid):
+                await self.emit(
+                    "throttled",
+                    {
+                        "reason": admission.value,
+                        "retry_after": frame_admission.retry_after,
+                    },
+                    room=sid,
+                )
+        if admission is not Admission.ADMITTED:
+            return
+
+        frame_data: dict[str, Any] | None = data
+        try:
+            while frame_data is not None:
+                async with frame_admission.processing():
+                    await self._process_frame(sid, frame_data)
+                frame_data = frame_admission.next(sid)
+        except BaseException:
+            frame_admission.release(sid)
+            raise
+
+    async def _process_frame(self, sid: str, data: dict[str, Any]) -> None:
+        """Process one video stream frame for authentication.
 
-        if not user_session.pending_oauth:
+        Args:
+            sid: Session ID of the client
+            data: Raw video frame data
+        """
+        user_session = await self.sessions.get(sid)
+
+        if user_session is None or not user_session.pending_oauth:
             await self.emit_error(
                 sid,
                 "Start auth first by calling event 'start_auth'",
@@ -407,68 +672,35 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
             await self.emit_error(sid, "Invalid frame orientation value")
             return
 
-        try:
-            frame = parse_frame(raw_frame)
-        except ValueError as e:
-            await self.emit_error(sid, str(e))
+        if (face_embedding := await self._embed_frame(sid, raw_frame)) is None:
             return
 
-        # async with self.session(sid) as session:
-        #     if len(session.liveness_frames) < 4:
-        #         session.liveness_frames.append(frame)
-        #         return
-        #     elif len(session.liveness_frames) == 4:
-        #         session.liveness_frames.append(frame)
-        #     else:
-        #         session.liveness_frames = [frame]
-        #         return
-
-        # liveness_score = infer_liveness_from_frames(
-        #     [user_session.liveness_frames]
-        # )[0]
-        # if liveness_score < settings.LIVENESS_THRESHOLD:
-        #     await self.emit_error(sid, "Liveness check failed")
-        #     return
-
-        try:
-            largest_face = extract_largest_face(
-                frame,
-                anti_spoofing=True,
-                embed=True,
-            )
-        except FaceSpoofingDetected:
-            await self.emit_error(sid, "Spoofing detected")
-            return
-
-        if largest_face is None:
-            await self.emit_error(sid, "No valid face detected")
-            return
-
-        db_session = next(get_db())
-        match user_session.auth_type:
-            case AuthTypes.REGISTER:
-                await self._handle_register(
-                    sid,
-                    db_session,
-                    largest_face["embedding"],
-                    frame_orientation,
-                )
-            case AuthTypes.LOGIN:
-                await self._handle_login(
-                    sid,
-                    db_session,
-                    user_session,
-                    largest_face["embedding"],
-                    frame_orientation,
-                )
-            case AuthTypes.OAUTH:
-                await self._handle_oauth(
-                    sid,
-                    db_session,
-                    user_session,
-                    largest_face["embedding"],
-                    frame_orientation,
-                )
+        async with async_session_scope() as db_session:
+            match user_session.auth_type:
+                case AuthTypes.REGISTER:
+                    await self._handle_register(
+                        sid,
+                        db_session,
+                        user_session,
+                        face_embedding,
+                        frame_orientation,
+                    )
+                case AuthTypes.LOGIN:
+                    await self._handle_login(
+                        sid,
+                        db_session,
+                        user_session,
+                        face_embedding,
+                        frame_orientation,
+                    )
+                case AuthTypes.OAUTH:
+                    await self._handle_oauth(
+                        sid,
+                        db_session,
+                        user_session,
+                        face_embedding,
+                        frame_orientation,
+                    )
 
     async def on_consent_captured(self, sid: str) -> None:
         """Handle user consent for OAuth project capture.
@@ -477,59 +709,46 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
             sid: Session ID of the client
             data: Consent data containing project ID and consent status
         """
-        db_session = next(get_db())
-        user_session = SioUserSession(
-            **(await self.get_session(sid)).model_dump()
-        )
+        user_session = await self.sessions.get(sid)
 
-        if not (user_id := user_session.user_id):
+        if user_session is None or not (user_id := user_session.user_id):
             await self.emit_error(sid, "Unknown user")
             return
 
-        if not (code_challenge := user_session.code_challenge):
-            await self.emit_error(sid, "Missing code_challenge")
-            return
-
-        if not (oauth_session_id := user_session.oauth_session_uuid):
-            await self.emit_error(sid, "Missing oauth_session_id")
+        code_challenge = user_session.code_challenge
+        project_id = user_session.project_id
+        if not code_challenge or project_id is None:
+            await self.emit_error(
+                sid, "Start auth first by calling event 'start_auth'"
+            )
             return
 
-        if not (
-            oauth_session_obj := oauth_session.get(
+        async with async_session_scope() as db_session:
+            await user_project_link.acreate(
                 session=db_session,
-                id=oauth_session_id,
+                owner_id=UUID(user_id),
+                obj_in=UserProjectLinkCreate(
+                    project_id=project_id,
+                ),
             )
-        ):
-            await self.emit_error(sid, "Invalid oauth_session_id")
-            return
-
-        project_id = oauth_session_obj.project_id
 
-        user_project_link.create(
-            session=db_session,
-            owner_id=UUID(user_id),
-            obj_in=UserProjectLinkCreate(
+            auth_obj = AuthCodeCreate(
+                code=generate_auth_code(),
+                code_challenge=code_challenge,
                 project_id=project_id,
-            ),
-        )
-
-        auth_obj = AuthCodeCreate(
-            code=generate_auth_code(),
-            code_challenge=code_challenge,
-            project_id=oauth_session_obj.project_id,
-        )
+            )
 
-        auth_code.create(
-            session=db_session,
-            obj_in=auth_obj,
-            owner_id=UUID(user_id),
-        )
+            await auth_code.acreate(
+                session=db_session,
+                obj_in=auth_obj,
+                owner_id=UUID(user_id),
+            )
 
-        await self.emit(
-            "auth_success",
-            {"auth_code": auth_obj.code},
-            room=sid,
-        )
+            await self.emit(
+                "auth_success",
+                {"auth_code": auth_obj.code},
+                room=sid,
+            )
 
     async def on_disconnect(self, sid: str) -> None:
         """Handle client disconnection events.
@@ -537,4 +756,7 @@ class AuthNamespace(socketio.AsyncNamespace):  # type: ignore
         Args:
             sid: Session ID of the disconnecting client
         """
+        self.liveness_buffers.pop(sid, None)
+        frame_admission.remove(sid)
+        await self.sessions.remove(sid)
         logger.info(f"Disconnected: {sid}")
@@ -1,50 +1,95 @@
+import asyncio
+import hashlib
 import logging
-from typing import Annotated
+import threading
+from datetime import UTC, datetime
+from typing import Annotated, Any, NoReturn
 
+import jwt
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from supabase import (
     AClient,
     AsyncClientOptions,
+    AuthApiError,
     Client,
+    ClientOptions,
     acreate_client,
     create_client,
 )
 
 from app.core.config import settings
 from app.schemas.auth import UserIn
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger("uvicorn")
 
 
+# Process-wide clients: every Supabase client owns an HTTP connection pool,
+# creating one per call paid a new TCP and TLS handshake every time. The
+# service role key never signs in, so there is no session to persist or
+# refresh. Only the auth API is used, the lazily created postgrest and
+# storage clients are never opened.
+_super_client: Client | None = None
+_super_client_lock = threading.Lock()
+_async_super_client: AClient | None = None
+_async_super_client_lock = asyncio.Lock()
+
+
 def get_super_client() -> Client:
-    client = create_client(
-        settings.SUPABASE_URL,
-        settings.SUPABASE_KEY,
-    )
-    if not client:
+    global _super_client
+    with _super_client_lock:
+        if _super_client is None:
+            _super_client = create_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_KEY,
+                options=ClientOptions(
+                    auto_refresh_token=False,
+                    persist_session=False,
+                ),
+            )
+    if not _super_client:
         raise HTTPException(
             status_code=500,
             detail="Super client not initialized",
         )
-    return client
+    return _super_client
 
 
 async def get_async_super_client() -> AClient:
     """for validation access_token init at life span event"""
-    super_client = await acreate_client(
-        settings.SUPABASE_URL,
-        settings.SUPABASE_KEY,
-        options=AsyncClientOptions(
-            postgrest_client_timeout=10, storage_client_timeout=10
-        ),
-    )
-    if not super_client:
+    global _async_super_client
+    async with _async_super_client_lock:
+        if _async_super_client is None:
+            _async_super_client = await acreate_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_KEY,
+                options=AsyncClientOptions(
+                    postgrest_client_timeout=10,
+                    storage_client_timeout=10,
+                    auto_refresh_token=False,
+                    persist_session=False,
+                ),
+            )
+    if not _async_super_client:
         raise HTTPException(
             status_code=500,
             detail="Super client not initialized",
         )
-    return super_client
+    return _async_super_client
+
+
+async def close_super_clients() -> None:
+    """Close the HTTP connection pools of the shared clients."""
+    global _super_client, _async_super_client
+    async with _async_super_client_lock:
+        if _async_super_client is not None:
+            await _async_super_client.auth.close()
+            _async_super_client = None
+    with _super_client_lock:
+        if _super_client is not None:
+            _super_client.auth.close()
+            _super_client = None
 
 
 SuperClient = Annotated[AClient, Depends(get_async_super_client)]
@@ -52,16 +97,106 @@ SuperClient = Annotated[AClient, Depends(get_async_super_client)]
 security = HTTPBearer()
 
 
-async def get_current_user(
+# tokens recently rejected, by SHA-256, so replays of a bad token are
+# refused without verifying it again
+_rejected_tokens: TTLCache[str, bool] = TTLCache(
+    maxsize=settings.AUTH_NEGATIVE_CACHE_SIZE,
+    ttl=settings.AUTH_NEGATIVE_CACHE_TTL,
+)
+
+
+def _reject(token_hash: str, reason: Any) -> NoReturn:
+    logger.error(f"Error getting user: {reason}")
+    _rejected_tokens.set(token_hash, True)
+    raise HTTPException(status_code=404, detail="User not found")
+
+
+def _unavailable(reason: Any) -> NoReturn:
+    # says nothing about the token, so it is not cached as rejected
+    logger.error(f"Error reaching Supabase auth: {reason}")
+    raise HTTPException(
+        status_code=503, detail="Authentication service unavailable"
+    )
+
+
+def verify_token_locally(token: str) -> UserIn:
+    """Build the user from the claims of a Supabase access token.
+
+    The token must be signed with `SUPABASE_JWT_SECRET`, unexpired, and
+    issued to an authenticated user.
+
+    Raises:
+        jwt.PyJWTError: The token is invalid
+    """
+    claims = jwt.decode(
+        token,
+        settings.SUPABASE_JWT_SECRET,
+        algorithms=[settings.JWT_ALGORITHM],
+        audience="authenticated",
+        options={"require": ["exp", "sub", "aud", "role"]},
+    )
+    if claims["role"] != "authenticated":
+        raise jwt.InvalidTokenError(f"Unexpected role {claims['role']}")
+
+    return UserIn(
+        id=claims["sub"],
+        aud=claims["aud"],
+        role=claims["role"],
+        email=claims.get("email"),
+        phone=claims.get("phone"),
+        app_metadata=claims.get("app_metadata", {}),
+        user_metadata=claims.get("user_metadata", {}),
+        is_anonymous=claims.get("is_anonymous", False),
+        # the claims do not carry the account creation time
+        created_at=(
+            datetime.fromtimestamp(claims["iat"], UTC)
+            if "iat" in claims
+            else datetime.now(UTC)
+        ),
+        access_token=token,
+    )
+
+
+async def get_remote_user(
     super_client: SuperClient,
     credentials: HTTPAuthorizationCredentials = Security(security),
 ) -> UserIn:
-    """get current user from token and validate same time"""
+    """get current user from Supabase, for routes that must see revoked
+    sessions and deleted users"""
     token = credentials.credentials
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    if token_hash in _rejected_tokens:
+        _reject(token_hash, "token recently rejected")
+
     try:
         user_rsp = await super_client.auth.get_user(jwt=token)
+    except AuthApiError as e:
+        if e.status >= 500:
+            _unavailable(e)
+        _reject(token_hash, e)
     except Exception as e:
-        logger.error(f"Error getting user: {e}")
-        raise HTTPException(status_code=404, detail="User not found")
+        # timeouts and network errors, AuthRetryableError included
+        _unavailable(e)
+    if user_rsp is None:
+        _reject(token_hash, "no user for the token")
 
     return UserIn(**user_rsp.user.model_dump(), access_token=token)
+
+
+async def get_current_user(
+    super_client: SuperClient,
+    credentials: HTTPAuthorizationCredentials = Security(security),
+) -> UserIn:
+    """get current user from token and validate same time"""
+    if settings.SUPABASE_JWT_VERIFICATION == "remote":
+        return await get_remote_user(super_client, credentials)
+
+    token = credentials.credentials
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    if token_hash in _rejected_tokens:
+        _reject(token_hash, "token recently rejected")
+
+    try:
+        return verify_token_locally(token)
+    except jwt.PyJWTError as e:
+        _reject(token_hash, e)
@@ -1,3 +1,4 @@
+import os
 import secrets
 import warnings
 from typing import Annotated, Any, Literal, Self
@@ -7,6 +8,7 @@ from pydantic import (
     AnyUrl,
     BeforeValidator,
     PostgresDsn,
+    PrivateAttr,
     computed_field,
     model_validator,
 )
@@ -24,6 +26,12 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def normalize_origin(origin: str) -> str:
+    """Origin as compared to the configured ones, scheme and host are case
+    insensitive and a trailing slash is ignored."""
+    return origin.strip().rstrip("/").lower()
+
+
 class Settings(BaseSettings):
     """auto load config from .env and validate settings"""
 
@@ -63,6 +71,17 @@ class Settings(BaseSettings):
             str(origin).rstrip("/") for origin in self.TRUSTED_LOGIN_ORIGINS
         ]
 
+    # normalized origins, built once by _build_origin_sets
+    _trusted_login_origin_set: frozenset[str] = PrivateAttr(frozenset())
+
+    def is_trusted_login_origin(self, origin: str) -> bool:
+        # origins sent by browsers are normalized already, the first lookup
+        # answers them without building a new string
+        return (
+            origin in self._trusted_login_origin_set
+            or normalize_origin(origin) in self._trusted_login_origin_set
+        )
+
     PROJECT_NAME: str
 
     # DB
@@ -70,21 +89,88 @@ class Settings(BaseSettings):
     # NOTE: super user key is service_role key instead of the anon key
     SUPABASE_KEY: str
     SUPABASE_JWT_SECRET: str
+    # "local" checks access tokens with SUPABASE_JWT_SECRET, "remote" asks
+    # Supabase for every request
+    SUPABASE_JWT_VERIFICATION: Literal["local", "remote"] = "local"
+    AUTH_NEGATIVE_CACHE_TTL: float = 30  # In seconds
+    AUTH_NEGATIVE_CACHE_SIZE: int = 10_000  # rejected tokens
+    # Supabase user profiles used to issue tokens
+    USER_DATA_CACHE_SIZE: int = 10_000
+    USER_DATA_CACHE_TTL: float = 300  # In seconds
+    USER_DATA_NEGATIVE_CACHE_TTL: float = 30  # In seconds
+
+    # OAuth
+    AUTH_CODE_LIFESPAN: int = 300  # In seconds
+    # project and trusted origin pairs checked by /oauth/create-session
+    TRUSTED_ORIGIN_CACHE_SIZE: int = 10_000
+    TRUSTED_ORIGIN_CACHE_TTL: float = 60  # In seconds
+    TRUSTED_ORIGIN_NEGATIVE_CACHE_TTL: float = 10  # In seconds
+    # sessions and refresh tokens not refreshed for that long are reaped
+    OAUTH_SESSION_LIFESPAN: int = 30 * 24 * 3600  # In seconds
+    # removal of expired auth codes, sessions and refresh tokens
+    REAPER_ENABLED: bool = True
+    REAPER_INTERVAL: float = 300  # In seconds
+    REAPER_BATCH_SIZE: int = 1000  # rows per delete statement
 
     FACE_MATCH_THRESHOLD: float = 10  # distance
     ANTI_SPOOF_THRESHOLD: float = 0.90
+    # "local" answers face_match from an in-process copy of the embeddings
+    FACE_MATCH_BACKEND: Literal["db", "local"] = "db"
+    FACE_INDEX_SYNC_INTERVAL: float = 30  # In seconds
+    FACE_INDEX_RELOAD_INTERVAL: float = 3600  # In seconds
+    # "fused" matches logins on several orientations captured in a row
+    FACE_MATCH_MODE: Literal["single", "fused"] = "single"
+    FACE_MATCH_FUSED_ORIENTATIONS: int = 2  # orientations per fused match
+    FACE_MATCH_CANDIDATES: int = 5  # nearest faces per orientation
 
     # liveness detection
     LIVENESS_MODEL_PATH: str = (
         "./app/utils/antispoofing/model/liveness_model.onnx"
     )
     LIVENESS_THRESHOLD: float = 0.5
+    LIVENESS_ENABLED: bool = False
+    LIVENESS_WINDOW_SIZE: int = 5  # frames per scored sequence
+    LIVENESS_STRIDE: int = 5  # new frames between two scored windows
+    # ONNX Runtime session, 0 threads lets ONNX Runtime decide
+    LIVENESS_INTRA_OP_THREADS: int = 0
+    LIVENESS_INTER_OP_THREADS: int = 0
+    LIVENESS_GRAPH_OPTIMIZATION_LEVEL: Literal[
+        "disable", "basic", "extended", "all"
+    ] = "all"
+    LIVENESS_ENABLE_MEM_ARENA: bool = True
+    LIVENESS_ENABLE_MEM_PATTERN: bool = True
+
+    # inference executor
+    INFERENCE_EXECUTOR: Literal["thread", "process"] = "thread"
+    INFERENCE_WORKERS: int = os.cpu_count() or 1
+    INFERENCE_MAX_QUEUE_SIZE: int = 64  # pending jobs before rejecting
+    INFERENCE_DECODE_TIMEOUT: float = 2  # In seconds
+    INFERENCE_DETECTION_TIMEOUT: float = 10  # In seconds
+    INFERENCE_EMBEDDING_TIMEOUT: float = 10  # In seconds
+    INFERENCE_LIVENESS_TIMEOUT: float = 10  # In seconds
+    # cross-session embedding batches
+    EMBEDDING_MAX_BATCH_SIZE: int = 16
+    EMBEDDING_MAX_WAIT: float = 0.005  # In seconds
+    # frames streamed over Socket.IO
+    STREAM_MAX_FPS: float = 10  # per client, 0 disables the limit
+    STREAM_MAX_IN_FLIGHT: int = 32  # frames processed at once, all clients
+    STREAM_THROTTLED_HINT_INTERVAL: float = 1  # In seconds
 
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # executions of a statement before psycopg prepares it server side,
+    # None disables prepared statements (e.g. behind pgbouncer)
+    POSTGRES_PREPARE_THRESHOLD: int | None = 5
+    # connection pool, one per engine in every worker process
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
+    POSTGRES_POOL_TIMEOUT: float = 30  # In seconds
+    POSTGRES_POOL_RECYCLE: int = 1800  # In seconds, -1 disables
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_STATEMENT_TIMEOUT: int = 10_000  # In milliseconds, 0 disables
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -112,6 +198,17 @@ class Settings(BaseSettings):
             else:
                 raise ValueError(message)
 
+    def _build_origin_sets(self) -> None:
+        self._trusted_login_origin_set = frozenset(
+            normalize_origin(origin)
+            for origin in self.all_trusted_login_origins
+        )
+
+    @model_validator(mode="after")
+    def _materialize_origin_sets(self) -> Self:
+        self._build_origin_sets()
+        return self
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("JWT_SECRET", self.JWT_SECRET)
@@ -123,3 +220,18 @@ class Settings(BaseSettings):
 
 
 settings = Settings()  # type: ignore[call-arg] # load args from env
+
+
+def reload_settings() -> Settings:
+    """Reload `settings` from the environment and .env file in place.
+
+    Modules keep the `settings` object they imported and see the new values.
+    Values copied at import time, e.g. engine pool sizes, cache sizes and
+    default arguments, keep their old values until a restart.
+    """
+    load_dotenv("../.env", override=True)
+    new_settings = Settings()  # type: ignore[call-arg]
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(new_settings, name))
+    settings._build_origin_sets()
+    return settings
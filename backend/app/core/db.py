@@ -1,13 +1,30 @@
 import logging
-from collections.abc import Generator
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Generator,
+    Iterator,
+)
+from contextlib import asynccontextmanager, contextmanager
 from secrets import token_urlsafe
+from typing import Any
 from uuid import UUID
 
+import psycopg
+from pgvector.psycopg import (  # type: ignore
+    register_vector,
+    register_vector_async,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.auth import get_super_client
 from app.core.config import settings
+from app.core.db_pool import PoolStats, timed_pool_class
 from app.core.security import (
+    aget_user_data,
     create_jwt_token,
     create_supabase_jwt_token,
     get_user_data,
@@ -25,20 +42,141 @@ from app.models.oauth_session import (
 )
 from app.models.session import new_session
 from app.schemas import OAuthToken, Token
+from app.utils.errors import InvalidRefreshToken
 
 # make sure all SQLModel models are imported (app.models) before initializing
 # DB otherwise, SQLModel might fail to initialize relationships properly.
 # for more details:
 # https://github.com/fastapi/full-stack-fastapi-template/issues/28
 logger = logging.getLogger("uvicorn")
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+
+def _engine_options(pool_stats: PoolStats, asyncio: bool) -> dict[str, Any]:
+    return {
+        "poolclass": timed_pool_class(pool_stats, asyncio=asyncio),
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+        "connect_args": {
+            "prepare_threshold": settings.POSTGRES_PREPARE_THRESHOLD,
+            "options": (
+                f"-c statement_timeout={settings.POSTGRES_STATEMENT_TIMEOUT}"
+            ),
+        },
+    }
+
+
+pool_stats = PoolStats()
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    **_engine_options(pool_stats, asyncio=False),
+)
+pool_stats.listen(engine)
+
+
+@event.listens_for(engine, "connect")
+def register_vector_types(dbapi_connection: Any, _: Any) -> None:
+    """Let psycopg exchange pgvector values in binary format."""
+    try:
+        register_vector(dbapi_connection)
+    except psycopg.ProgrammingError:
+        # the vector extension is created by the migrations, connections
+        # made before them (pre-start checks, alembic) don't need it
+        logger.error(
+            "vector type not found, face embeddings can't be bound on this "
+            "connection, run the migrations"
+        )
+
+
+# same database through psycopg's async connections, for the code running
+# on the event loop (Socket.IO handlers)
+async_pool_stats = PoolStats()
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    **_engine_options(async_pool_stats, asyncio=True),
+)
+async_pool_stats.listen(async_engine.sync_engine)
+# objects stay usable after commit without a lazy refresh, which would need
+# an await
+async_session_maker = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_vector_types_async(dbapi_connection: Any, _: Any) -> None:
+    """Async engine counterpart of `register_vector_types`."""
+    try:
+        dbapi_connection.run_async(register_vector_async)
+    except psycopg.ProgrammingError:
+        logger.error(
+            "vector type not found, face embeddings can't be bound on this "
+            "connection, run the migrations"
+        )
 
 
 def get_db() -> Generator[Session, None]:
-    with Session(engine) as session:
+    # objects stay usable after commit without a refresh SELECT
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_scope() as session:
         yield session
 
 
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """Session for one unit of async work, e.g. a Socket.IO event.
+
+    The connection goes back to the pool when the block exits, after
+    rolling back whatever the block did not commit.
+    """
+    async with async_session_maker() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+
+
+@contextmanager
+def transaction(session: Session) -> Iterator[Session]:
+    """Commit the writes of the block, made with `commit=False`, at once.
+
+    Either all of them are committed or, if the block raises, none.
+    """
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+
+
+@asynccontextmanager
+async def atransaction(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Async variant of `transaction`"""
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+
+
+def pool_metrics() -> dict[str, Any]:
+    return {
+        "sync": pool_stats.snapshot(engine),
+        "async": async_pool_stats.snapshot(async_engine.sync_engine),
+    }
+
+
 def init_db(session: Session) -> None:
     # Tables should be created with Alembic migrations
     # But if you don't want to use migrations, create
@@ -75,21 +213,24 @@ def generate_oauth_token(
     if not (user_data := get_user_data(user_id)):
         raise ValueError("User not found")
 
-    oauth_session_obj = oauth_session.create(
-        session,
-        obj_in=OAuthSessionCreate(
-            project_id=project_id,
-        ),
-        owner_id=user_id,
-    )
+    with transaction(session):
+        oauth_session_obj = oauth_session.create(
+            session,
+            obj_in=OAuthSessionCreate(
+                project_id=project_id,
+            ),
+            owner_id=user_id,
+            commit=False,
+        )
 
-    oauth_refresh_token_obj = oauth_refresh_token.create(
-        session,
-        obj_in=OAuthRefreshTokenCreate(
-            oauth_session_id=oauth_session_obj.id,
-        ),
-        owner_id=user_id,
-    )
+        oauth_refresh_token_obj = oauth_refresh_token.create(
+            session,
+            obj_in=OAuthRefreshTokenCreate(
+                oauth_session_id=oauth_session_obj.id,
+            ),
+            owner_id=user_id,
+            commit=False,
+        )
 
     oauth_token = OAuthToken(
         oauth_session_id=oauth_session_obj.id,
@@ -109,25 +250,36 @@ def refresh_oauth_token(
     if not (user_data := get_user_data(refresh_token.owner_id)):
         raise ValueError("User not found")
 
-    # create a new refresh token
-    new_oauth_refresh_token_obj = oauth_refresh_token.create(
-        session,
-        obj_in=OAuthRefreshTokenCreate(
-            oauth_session_id=oauth_session_obj.id,
-        ),
-        owner_id=refresh_token.owner_id,
-    )
-    oauth_session.update(
-        session,
-        id=oauth_session_obj.id,
-        obj_in=OAuthSessionUpdate(
-            project_id=oauth_session_obj.project_id,
-            refreshed_at=new_oauth_refresh_token_obj.created_at,
-        ),
-    )
+    # rotate the refresh token atomically
+    with transaction(session):
+        # delete the old refresh token first, of concurrent refreshes with
+        # the same token only the one that deletes it goes on
+        if (
+            oauth_refresh_token.remove(
+                session, id=refresh_token.id, commit=False
+            )
+            is None
+        ):
+            raise InvalidRefreshToken()
 
-    # delete the old refresh token
-    oauth_refresh_token.remove(session, id=refresh_token.id)
+        # create a new refresh token
+        new_oauth_refresh_token_obj = oauth_refresh_token.create(
+            session,
+            obj_in=OAuthRefreshTokenCreate(
+                oauth_session_id=oauth_session_obj.id,
+            ),
+            owner_id=refresh_token.owner_id,
+            commit=False,
+        )
+        oauth_session.update(
+            session,
+            id=oauth_session_obj.id,
+            obj_in=OAuthSessionUpdate(
+                project_id=oauth_session_obj.project_id,
+                refreshed_at=new_oauth_refresh_token_obj.created_at,
+            ),
+            commit=False,
+        )
 
     oauth_token = OAuthToken(
         oauth_session_id=oauth_session_obj.id,
@@ -139,26 +291,30 @@ def refresh_oauth_token(
     return oauth_token
 
 
-def generate_supabase_session(user_id: UUID) -> Token:
-    if not (user_data := get_user_data(user_id)):
+async def generate_supabase_session(
+    session: AsyncSession,
+    user_id: UUID,
+) -> Token:
+    if not (user_data := await aget_user_data(user_id)):
         raise ValueError("User not found")
 
     jwt_token = create_supabase_jwt_token(user_data)
 
-    session = next(get_db())
-
-    new_session_obj = new_session(user_id)
-    session.add(new_session_obj)
-    session.commit()
-
     refresh_token = token_urlsafe(16)
-    refresh_token_obj = RefreshToken(
-        token=refresh_token,
-        user_id=user_id,
-        session_id=new_session_obj.id,
-    )
-    session.add(refresh_token_obj)
-    session.commit()
+    async with atransaction(session):
+        new_session_obj = new_session(user_id)
+        session.add(new_session_obj)
+        # the models do not declare the refresh_tokens.session_id foreign
+        # key, insert the session first
+        await session.flush()
+
+        session.add(
+            RefreshToken(
+                token=refresh_token,
+                user_id=user_id,
+                session_id=new_session_obj.id,
+            )
+        )
 
     token = Token(
         access_token=jwt_token,
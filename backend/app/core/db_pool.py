@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    QueuePool,
+)
+
+
+class PoolStats:
+    """Checkout counters and wait times of one engine's connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters = {
+            "connects": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "invalidated": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def listen(self, engine: Engine) -> None:
+        """Count connections, checkouts and invalidations of `engine`."""
+        for name, counter in (
+            ("connect", "connects"),
+            ("checkout", "checkouts"),
+            ("invalidate", "invalidated"),
+        ):
+            event.listen(
+                engine,
+                name,
+                lambda *_, counter=counter: self.count(counter),
+            )
+
+    def snapshot(self, engine: Engine) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = {
+                **self._counters,
+                "wait_total_seconds": self._wait_total,
+                "wait_max_seconds": self._wait_max,
+                "wait_mean_seconds": (
+                    self._wait_total / self._counters["checkouts"]
+                    if self._counters["checkouts"]
+                    else 0.0
+                ),
+            }
+        if isinstance(pool := engine.pool, QueuePool):
+            stats |= {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        return stats
+
+
+class _TimedQueuePool(QueuePool):
+    stats: PoolStats
+
+    # QueuePool blocks in _do_get while the pool and its overflow are
+    # exhausted, no pool event marks the start of that wait. The time also
+    # covers opening a new connection when the pool has room for one
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.count("timeouts")
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started_at)
+
+
+def timed_pool_class(
+    stats: PoolStats,
+    *,
+    asyncio: bool = False,
+) -> type[QueuePool]:
+    """Queue pool class recording its checkout waits in `stats`.
+
+    `Engine.dispose` recreates the pool from its class, so the stats are
+    bound to a class built for the engine rather than to the pool.
+    """
+    bases: tuple[type[QueuePool], ...] = (_TimedQueuePool,)
+    if asyncio:
+        bases += (AsyncAdaptedQueuePool,)
+    return type("TimedQueuePool", bases, {"stats": stats})
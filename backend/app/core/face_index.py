@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime
+from typing import Any, NamedTuple
+from uuid import UUID
+
+import numpy as np
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models.face import Face, FaceFusedMatch, FaceMatch, FaceOrientation
+
+logger = logging.getLogger("uvicorn")
+
+EMBEDDING_DIM = 128
+
+
+class _Rows(NamedTuple):
+    """Enrolled faces, row i of every array belongs to face_ids[i].
+
+    Orientations a face was enrolled without are NaN rows.
+    """
+
+    face_ids: np.ndarray  # (n,) object array of UUID
+    owner_ids: np.ndarray  # (n,) object array of UUID
+    # (n, EMBEDDING_DIM) float32 per orientation
+    matrices: dict[FaceOrientation, np.ndarray]
+    # (n,) float32 squared L2 norm of each row, per orientation
+    sq_norms: dict[FaceOrientation, np.ndarray]
+
+
+def _rows(faces: Iterable[Face]) -> _Rows:
+    faces = list(faces)
+    matrices = {}
+    for orientation in FaceOrientation:
+        matrix = np.full((len(faces), EMBEDDING_DIM), np.nan, dtype=np.float32)
+        for i, db_face in enumerate(faces):
+            embedding = getattr(db_face, f"{orientation.value}_embedding")
+            if embedding is not None:
+                matrix[i] = embedding
+        matrices[orientation] = matrix
+    return _Rows(
+        face_ids=np.array([db_face.id for db_face in faces], dtype=object),
+        owner_ids=np.array(
+            [db_face.owner_id for db_face in faces], dtype=object
+        ),
+        matrices=matrices,
+        sq_norms={
+            orientation: np.einsum("ij,ij->i", matrix, matrix)
+            for orientation, matrix in matrices.items()
+        },
+    )
+
+
+def _concat(rows: _Rows, new: _Rows) -> _Rows:
+    return _Rows(
+        face_ids=np.concatenate([rows.face_ids, new.face_ids]),
+        owner_ids=np.concatenate([rows.owner_ids, new.owner_ids]),
+        matrices={
+            orientation: np.concatenate([matrix, new.matrices[orientation]])
+            for orientation, matrix in rows.matrices.items()
+        },
+        sq_norms={
+            orientation: np.concatenate([sq_norms, new.sq_norms[orientation]])
+            for orientation, sq_norms in rows.sq_norms.items()
+        },
+    )
+
+
+def _keep(rows: _Rows, mask: np.ndarray) -> _Rows:
+    return _Rows(
+        face_ids=rows.face_ids[mask],
+        owner_ids=rows.owner_ids[mask],
+        matrices={
+            orientation: matrix[mask]
+            for orientation, matrix in rows.matrices.items()
+        },
+        sq_norms={
+            orientation: sq_norms[mask]
+            for orientation, sq_norms in rows.sq_norms.items()
+        },
+    )
+
+
+def fuse_distances(
+    *,
+    owner_ids: list[UUID],
+    distances: Mapping[FaceOrientation, list[float | None]],
+    threshold: float,
+    k: int,
+) -> list[FaceFusedMatch]:
+    """Fuse per-orientation distances of candidate faces.
+
+    The fused distance of a face is the mean of its distances over the
+    captured orientations it was enrolled with, faces missing all of them
+    are dropped.
+
+    Args:
+        owner_ids: Owner of each candidate face
+        distances: Distance of each candidate face per captured orientation,
+            None where the face has no embedding for that orientation
+        threshold: Maximum fused distance
+        k: Maximum number of matches
+
+    Returns:
+        Up to `k` matches within `threshold`, closest first
+    """
+    matches = []
+    for i, owner_id in enumerate(owner_ids):
+        face_distances = {
+            orientation: orientation_distances[i]
+            for orientation, orientation_distances in distances.items()
+        }
+        known = [d for d in face_distances.values() if d is not None]
+        if not known:
+            continue
+        fused = sum(known) / len(known)
+        if fused < threshold:
+            matches.append(
+                FaceFusedMatch(
+                    owner_id=owner_id,
+                    distance=fused,
+                    distances=face_distances,
+                )
+            )
+    return sorted(matches, key=lambda match: match.distance)[:k]
+
+
+class LocalFaceIndex:
+    """In-process replica of the `face` table embeddings.
+
+    Holds one embedding matrix per `FaceOrientation` and answers nearest
+    neighbour queries with a single matrix-vector product, without a
+    database round trip. Rows are replaced, never mutated, so searches only
+    need the lock to read the current rows.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows = _rows([])
+        self._synced_until: datetime | None = None
+        self._loaded_at: float | None = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def active(self) -> bool:
+        """Whether face_match is served from the index. Writes only update
+        an active index, a disabled one is never read."""
+        return settings.FACE_MATCH_BACKEND == "local" and self.loaded
+
+    def load(self, session: Session) -> None:
+        """Replace the index content with every row of the `face` table."""
+        faces = session.exec(select(Face)).all()
+        rows = _rows(faces)
+        with self._lock:
+            self._rows = rows
+            self._synced_until = max(
+                (db_face.created_at for db_face in faces), default=None
+            )
+            self._loaded_at = time.monotonic()
+        logger.info(f"Face index loaded: {len(faces)} faces")
+
+    def sync(self, session: Session) -> tuple[int, int]:
+        """Add faces created since the last load or sync and drop the ones
+        deleted meanwhile, e.g. by another worker.
+
+        Returns:
+            Number of faces added and removed
+        """
+        statement = select(Face)
+        if self._synced_until is not None:
+            # >= so rows sharing the last timestamp are not missed, the ones
+            # already indexed are skipped by id below
+            statement = statement.where(
+                col(Face.created_at) >= self._synced_until
+            )
+        faces = session.exec(statement).all()
+        # only the ids, the embeddings of the remaining faces are kept
+        face_ids = set(session.exec(select(Face.id)).all())
+
+        with self._lock:
+            rows = self._rows
+            exists = np.fromiter(
+                (face_id in face_ids for face_id in rows.face_ids),
+                dtype=bool,
+                count=len(rows.face_ids),
+            )
+            removed = len(exists) - int(np.count_nonzero(exists))
+            if removed:
+                rows = _keep(rows, exists)
+            known = set(rows.face_ids)
+            new_faces = [
+                db_face for db_face in faces if db_face.id not in known
+            ]
+            if new_faces:
+                rows = _concat(rows, _rows(new_faces))
+            self._rows = rows
+            if faces:
+                self._synced_until = max(
+                    self._synced_until or faces[0].created_at,
+                    *(db_face.created_at for db_face in faces),
+                )
+        return len(new_faces), removed
+
+    def add(self, *db_faces: Face) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self._rows = _concat(self._rows, _rows(db_faces))
+
+    def remove(self, *face_ids: UUID) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self._rows = _keep(
+                self._rows,
+                ~np.isin(
+                    self._rows.face_ids, np.array(face_ids, dtype=object)
+                ),
+            )
+
+    def remove_owner(self, owner_id: UUID) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self._rows = _keep(self._rows, self._rows.owner_ids != owner_id)
+
+    @staticmethod
+    def _rank(
+        rows: _Rows,
+        orientation: FaceOrientation,
+        query: np.ndarray,
+    ) -> np.ndarray:
+        """Squared distances to `query` minus the constant |q|^2, ranking
+        rows like |x - q|^2 = |x|^2 - 2 x.q + |q|^2 does. Rows without an
+        embedding rank last."""
+        scores = rows.sq_norms[orientation] - 2 * (
+            rows.matrices[orientation] @ query
+        )
+        ranked: np.ndarray = np.nan_to_num(scores, nan=np.inf)
+        return ranked
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+    def search(
+        self,
+        embedding: list[float],
+        face_orientation: FaceOrientation,
+        threshold: float,
+    ) -> FaceMatch | None:
+        """Get the closest face within `threshold`, None on a miss."""
+        with self._lock:
+            rows = self._rows
+
+        match = None
+        if len(rows.face_ids):
+            query = np.asarray(embedding, dtype=np.float32)
+            best = int(np.argmin(self._rank(rows, face_orientation, query)))
+            # the expansion loses precision in float32, measure the winner
+            distance = float(
+                np.linalg.norm(rows.matrices[face_orientation][best] - query)
+            )
+            if distance < threshold:
+                match = FaceMatch(
+                    owner_id=rows.owner_ids[best], distance=distance
+                )
+
+        self._count(match is not None)
+        return match
+
+    def search_fused(
+        self,
+        embeddings: Mapping[FaceOrientation, list[float]],
+        threshold: float,
+        k: int,
+    ) -> list[FaceFusedMatch]:
+        """Local counterpart of `CRUDFace.face_match_fused`."""
+        with self._lock:
+            rows = self._rows
+
+        queries = {
+            orientation: np.asarray(embedding, dtype=np.float32)
+            for orientation, embedding in embeddings.items()
+        }
+        # union of the k nearest faces of every captured orientation
+        candidates = np.empty(0, dtype=np.intp)
+        for orientation, query in queries.items():
+            if not len(rows.face_ids):
+                break
+            scores = self._rank(rows, orientation, query)
+            nearest = np.argpartition(scores, min(k, len(scores)) - 1)[:k]
+            candidates = np.union1d(
+                candidates, nearest[np.isfinite(scores[nearest])]
+            )
+
+        matches = fuse_distances(
+            owner_ids=list(rows.owner_ids[candidates]),
+            distances={
+                orientation: [
+                    None if np.isnan(distance) else float(distance)
+                    for distance in np.linalg.norm(
+                        rows.matrices[orientation][candidates] - query,
+                        axis=1,
+                    )
+                ]
+                for orientation, query in queries.items()
+            },
+            threshold=threshold,
+            k=k,
+        )
+
+        self._count(bool(matches))
+        return matches
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the embeddings and ids."""
+        with self._lock:
+            rows = self._rows
+        # the id arrays hold pointers, add the size of the UUID objects
+        uuid_size = sys.getsizeof(UUID(int=0)) + sys.getsizeof(2**127)
+        return (
+            sum(matrix.nbytes for matrix in rows.matrices.values())
+            + sum(sq_norms.nbytes for sq_norms in rows.sq_norms.values())
+            + rows.face_ids.nbytes
+            + rows.owner_ids.nbytes
+            + (len(rows.face_ids) + len(rows.owner_ids)) * uuid_size
+        )
+
+    async def sync_forever(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        sync_interval: float,
+        reload_interval: float,
+    ) -> None:
+        """Keep the index current until cancelled.
+
+        Faces created or deleted by other processes are added and dropped
+        every `sync_interval` seconds, the index is rebuilt every
+        `reload_interval` seconds, e.g. to pick up updated embeddings.
+        """
+
+        def _sync() -> None:
+            with session_factory() as session:
+                if (
+                    self._loaded_at is None
+                    or time.monotonic() - self._loaded_at >= reload_interval
+                ):
+                    self.load(session)
+                else:
+                    self.sync(session)
+
+        while True:
+            await asyncio.sleep(sync_interval)
+            try:
+                await asyncio.to_thread(_sync)
+            except Exception as e:
+                logger.error(f"Error syncing face index: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            rows = self._rows
+        return {
+            "loaded": self.loaded,
+            "faces": {
+                orientation.value: int(np.count_nonzero(~np.isnan(sq_norms)))
+                for orientation, sq_norms in rows.sq_norms.items()
+            },
+            "memory_bytes": self.memory_bytes(),
+            "synced_until": self._synced_until,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+face_index = LocalFaceIndex()
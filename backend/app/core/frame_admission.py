@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any
+
+from app.core.config import settings
+
+
+class Admission(str, Enum):
+    """Outcome of `FrameAdmission.offer`"""
+
+    # process the frame now
+    ADMITTED = "admitted"
+    # kept in the latest-wins slot until the in-flight frame is done
+    PARKED = "parked"
+    # parked, dropping the older frame that was in the slot
+    SUPERSEDED = "superseded"
+    # dropped, the client streams faster than the frame rate limit
+    RATE_LIMITED = "rate_limited"
+
+
+class _Slot:
+    __slots__ = ("busy", "pending", "accepted_at", "hinted_at")
+
+    def __init__(self) -> None:
+        self.busy = False
+        self.pending: Any = None
+        self.accepted_at = float("-inf")
+        self.hinted_at = float("-inf")
+
+
+class FrameAdmission:
+    """Admission control of the frames streamed by each client.
+
+    A client has at most one frame in flight and one waiting in a
+    latest-wins slot, a newer frame replaces the waiting one since only the
+    most recent frame is worth processing. Frames arriving faster than
+    `max_fps` are dropped before they are queued, and at most
+    `max_in_flight` frames are processed at once over all clients, so one
+    chatty client can neither grow its own latency nor starve the others.
+    Rates are measured with `clock`.
+
+    Only used from the event loop, so it needs no lock.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_fps: float,
+        max_in_flight: int,
+        hint_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_fps = max_fps
+        self.max_in_flight = max_in_flight
+        self.hint_interval = hint_interval
+        self._clock = clock
+        self._min_interval = 1 / max_fps if max_fps > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._slots: dict[str, _Slot] = {}
+        self._in_flight = 0
+        self._counters = {
+            "admitted": 0,
+            "parked": 0,
+            "superseded": 0,
+            "rate_limited": 0,
+            "waited": 0,
+        }
+
+    def offer(self, sid: str, frame: Any) -> Admission:
+        """Admit, park or drop a frame of `sid`"""
+        slot = self._slots.get(sid)
+        if slot is None:
+            slot = self._slots[sid] = _Slot()
+
+        now = self._clock()
+        if now - slot.accepted_at < self._min_interval:
+            admission = Admission.RATE_LIMITED
+        else:
+            slot.accepted_at = now
+            if not slot.busy:
+                slot.busy = True
+                admission = Admission.ADMITTED
+            else:
+                admission = (
+                    Admission.PARKED
+                    if slot.pending is None
+                    else Admission.SUPERSEDED
+                )
+                slot.pending = frame
+
+        self._counters[admission.value] += 1
+        return admission
+
+    def next(self, sid: str) -> Any:
+        """Frame of `sid` to process after the one that is done, None once
+        `sid` has no frame in flight anymore."""
+        if (slot := self._slots.get(sid)) is None:
+            return None
+        frame, slot.pending = slot.pending, None
+        slot.busy = frame is not None
+        return frame
+
+    def release(self, sid: str) -> None:
+        """Drop the parked frame of `sid` after its in-flight one failed"""
+        if (slot := self._slots.get(sid)) is not None:
+            slot.busy = False
+            slot.pending = None
+
+    def should_hint(self, sid: str) -> bool:
+        """Whether to tell `sid` it is throttled, at most every
+        `hint_interval` seconds."""
+        if (slot := self._slots.get(sid)) is None:
+            return False
+        now = self._clock()
+        if now - slot.hinted_at < self.hint_interval:
+            return False
+        slot.hinted_at = now
+        return True
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds between two accepted frames of a client"""
+        return self._min_interval
+
+    @asynccontextmanager
+    async def processing(self) -> AsyncIterator[None]:
+        """Hold one of the `max_in_flight` processing slots"""
+        if self._semaphore.locked():
+            self._counters["waited"] += 1
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+
+    def remove(self, sid: str) -> None:
+        self._slots.pop(sid, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_fps": self.max_fps,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "clients": len(self._slots),
+            **self._counters,
+        }
+
+
+frame_admission = FrameAdmission(
+    max_fps=settings.STREAM_MAX_FPS,
+    max_in_flight=settings.STREAM_MAX_IN_FLIGHT,
+    hint_interval=settings.STREAM_THROTTLED_HINT_INTERVAL,
+)
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import Any, Literal, TypeVar
+
+from numpy import ndarray
+
+from app.core.config import settings
+from app.utils.detection import embed_faces
+from app.utils.errors import InferenceQueueFull, InferenceTimeout
+
+logger = logging.getLogger("uvicorn")
+
+T = TypeVar("T")
+
+
+class InferenceExecutor:
+    """Run blocking model inference outside of the asyncio event loop.
+
+    Jobs are submitted to a thread or process pool and awaited by the
+    caller, so a slow detection never blocks other sockets or HTTP routes.
+    The number of submitted-but-unfinished jobs is bounded, extra jobs are
+    rejected with `InferenceQueueFull` instead of piling up.
+    """
+
+    def __init__(
+        self,
+        *,
+        kind: Literal["thread", "process"],
+        max_workers: int,
+        max_queue_size: int,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+        }
+        self._stages: dict[str, dict[str, float]] = {}
+
+    def start(self, initializer: Callable[[], Any] | None = None) -> None:
+        """Create the worker pool.
+
+        Args:
+            initializer: Called once in every worker process, e.g. to load
+                the models. Ignored for thread pools, which share the models
+                of the current process.
+        """
+        if self._executor is not None:
+            return
+
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # TensorFlow is not fork-safe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference",
+            )
+        logger.info(
+            f"Inference executor started: {self.kind} x {self.max_workers}"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs submitted to the pool and not finished yet."""
+        return self._pending
+
+    def _release(
+        self, stage: str, started_at: float, future: Future[Any]
+    ) -> None:
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._counters["failed"] += 1
+            else:
+                self._counters["completed"] += 1
+            stage_stats = self._stages.setdefault(
+                stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            stage_stats["count"] += 1
+            stage_stats["total_seconds"] += elapsed
+            stage_stats["max_seconds"] = max(
+                stage_stats["max_seconds"], elapsed
+            )
+
+    async def run(
+        self,
+        stage: str,
+        func: Callable[..., T],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run `func(*args, **kwargs)` in the pool and await its result.
+
+        Args:
+            stage: Name of the pipeline stage, used for metrics and errors
+            func: Picklable callable when running a process pool
+            timeout: Seconds to wait for the result, None waits forever
+
+        Raises:
+            InferenceQueueFull: The pool already has `max_queue_size` jobs
+            InferenceTimeout: The job did not finish within `timeout`
+        """
+        self.start()
+        assert self._executor is not None
+
+        with self._lock:
+            if self._pending >= self.max_queue_size:
+                self._counters["rejected"] += 1
+                raise InferenceQueueFull(
+                    f"Inference queue is full ({self.max_queue_size})"
+                )
+            self._pending += 1
+            self._counters["submitted"] += 1
+
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # the pending count follows the pool job, not the awaiting coroutine,
+        # so a timed out job still counts until the worker is done with it
+        future.add_done_callback(
+            partial(self._release, stage, time.perf_counter())
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError:
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise InferenceTimeout(f"{stage} timed out after {timeout}s")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._pending,
+                **self._counters,
+                "stages": {
+                    stage: dict(stage_stats)
+                    for stage, stage_stats in self._stages.items()
+                },
+            }
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent face embedding requests into batched passes.
+
+    Crops awaiting an embedding are collected for at most `max_wait`
+    seconds or until `max_batch_size` crops are queued, then embedded with a
+    single forward pass on the inference executor. Each caller gets back
+    the embedding of its own crop.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        *,
+        max_batch_size: int,
+        max_wait: float,
+        timeout: float | None = None,
+    ) -> None:
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._queue: list[tuple[ndarray, asyncio.Future[list[float]]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # keep references to running batches, the loop only keeps weak ones
+        self._running: set[asyncio.Task[None]] = set()
+        self._batches = 0
+        self._faces = 0
+
+    async def embed(self, face: ndarray) -> list[float]:
+        """Embed one aligned face crop as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[float]] = loop.create_future()
+        self._queue.append((face, future))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        # drop requests whose caller is gone, e.g. a disconnected socket
+        batch = [(face, future) for face, future in batch if not future.done()]
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(
+        self,
+        batch: list[tuple[ndarray, asyncio.Future[list[float]]]],
+    ) -> None:
+        self._batches += 1
+        self._faces += len(batch)
+        try:
+            embeddings = await self.executor.run(
+                "embedding",
+                embed_faces,
+                [face for face, _ in batch],
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings, strict=True):
+            if not future.done():
+                future.set_result(embedding)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait": self.max_wait,
+            "queued": len(self._queue),
+            "batches": self._batches,
+            "faces": self._faces,
+            "mean_batch_size": (
+                self._faces / self._batches if self._batches else 0.0
+            ),
+        }
+
+
+inference_executor = InferenceExecutor(
+    kind=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    max_queue_size=settings.INFERENCE_MAX_QUEUE_SIZE,
+)
+
+embedding_batcher = EmbeddingBatcher(
+    inference_executor,
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    max_wait=settings.EMBEDDING_MAX_WAIT,
+    timeout=settings.INFERENCE_EMBEDDING_TIMEOUT,
+)
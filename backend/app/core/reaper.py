@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any, NamedTuple
+
+from sqlalchemy import ColumnElement, Table, delete, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_session_scope
+from app.models.auth_code import AuthCode
+from app.models.oauth_refresh_token import OAuthRefreshToken
+from app.models.oauth_session import OAuthSession
+
+logger = logging.getLogger("uvicorn")
+
+
+class _Target(NamedTuple):
+    name: str
+    table: Table
+    # indexed, rows whose age is past the lifespan are deleted
+    age: ColumnElement[datetime]
+    lifespan: Callable[[], int]  # In seconds
+
+
+auth_code_table: Table = AuthCode.__table__  # type: ignore[attr-defined]
+oauth_refresh_token_table: Table = (
+    OAuthRefreshToken.__table__  # type: ignore[attr-defined]
+)
+oauth_session_table: Table = (
+    OAuthSession.__table__  # type: ignore[attr-defined]
+)
+
+TARGETS = (
+    _Target(
+        "auth_code",
+        auth_code_table,
+        auth_code_table.c.created_at,
+        lambda: settings.AUTH_CODE_LIFESPAN,
+    ),
+    _Target(
+        "oauth_refresh_token",
+        oauth_refresh_token_table,
+        oauth_refresh_token_table.c.created_at,
+        lambda: settings.OAUTH_SESSION_LIFESPAN,
+    ),
+    _Target(
+        "oauth_session",
+        oauth_session_table,
+        func.coalesce(
+            oauth_session_table.c.refreshed_at,
+            oauth_session_table.c.created_at,
+        ),
+        lambda: settings.OAUTH_SESSION_LIFESPAN,
+    ),
+)
+
+
+class Reaper:
+    """Deletes expired auth codes and stale OAuth sessions and refresh
+    tokens, so the OAuth lookups work on the live rows only.
+
+    Rows are deleted oldest first in batches of `REAPER_BATCH_SIZE`, each
+    committed on its own, so no run holds locks on many rows for long.
+    Locked rows are skipped, workers reaping at the same time do not wait
+    on each other.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._failures = 0
+        self._last_run_at: datetime | None = None
+        self._last_run_seconds = 0.0
+        self._purged = {target.name: 0 for target in TARGETS}
+        self._last_purged = {target.name: 0 for target in TARGETS}
+
+    async def _purge(
+        self,
+        session: AsyncSession,
+        target: _Target,
+        now: datetime,
+        batch_size: int,
+    ) -> int:
+        cutoff = now - timedelta(seconds=target.lifespan())
+        id_column = target.table.c.id
+        batch = (
+            select(id_column)
+            .where(target.age < cutoff)
+            .order_by(target.age)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        purged = 0
+        while True:
+            result = await session.exec(  # type: ignore[call-overload]
+                delete(target.table).where(id_column.in_(batch))
+            )
+            await session.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
+
+    async def run_once(
+        self,
+        batch_size: int | None = None,
+    ) -> dict[str, int]:
+        """Delete the expired rows of every table.
+
+        Args:
+            batch_size: Rows deleted per statement, `REAPER_BATCH_SIZE`
+                when None
+
+        Returns:
+            Rows deleted per table
+        """
+        if batch_size is None:
+            batch_size = settings.REAPER_BATCH_SIZE
+        started_at = time.perf_counter()
+        now = datetime.now(UTC)
+        purged = {}
+        async with async_session_scope() as session:
+            for target in TARGETS:
+                purged[target.name] = await self._purge(
+                    session, target, now, batch_size
+                )
+
+        with self._lock:
+            self._runs += 1
+            self._last_run_at = now
+            self._last_run_seconds = time.perf_counter() - started_at
+            self._last_purged = purged
+            for name, count in purged.items():
+                self._purged[name] += count
+        return purged
+
+    async def run_forever(self, *, interval: float) -> None:
+        """Run `run_once` every `interval` seconds until cancelled"""
+        while True:
+            try:
+                purged = await self.run_once()
+                if any(purged.values()):
+                    logger.info(f"Reaped expired OAuth rows: {purged}")
+            except Exception as e:
+                with self._lock:
+                    self._failures += 1
+                logger.error(f"Error reaping expired OAuth rows: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self._runs,
+                "failures": self._failures,
+                "last_run_at": self._last_run_at,
+                "last_run_seconds": self._last_run_seconds,
+                "last_purged": dict(self._last_purged),
+                "purged": dict(self._purged),
+            }
+
+
+reaper = Reaper()
@@ -1,12 +1,17 @@
+import copy
 import datetime
+import logging
 from typing import Any
 from uuid import UUID
 
 import jwt
-from supabase import AuthError
+from supabase import AuthApiError, AuthError
 
-from app.core.auth import get_super_client
+from app.core.auth import get_async_super_client, get_super_client
 from app.core.config import settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger("uvicorn")
 
 
 def create_jwt_token(user_data: dict[str, Any]) -> str:
@@ -44,13 +49,85 @@ def create_supabase_jwt_token(user_data: dict[str, Any]) -> str:
     )
 
 
+# Supabase user profiles by user id, None for users that do not exist
+_user_data_cache: TTLCache[str, dict[str, Any] | None] = TTLCache(
+    maxsize=settings.USER_DATA_CACHE_SIZE,
+    ttl=settings.USER_DATA_CACHE_TTL,
+)
+_NOT_CACHED = object()
+
+
+def _cache_user_data(
+    user_id: str | UUID, user_data: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    _user_data_cache.set(
+        str(user_id),
+        user_data,
+        ttl=None if user_data else settings.USER_DATA_NEGATIVE_CACHE_TTL,
+    )
+    return copy.deepcopy(user_data)
+
+
+def _failed_lookup(
+    user_id: str | UUID, error: AuthError
+) -> dict[str, Any] | None:
+    """None for a failed lookup, cached only if the user does not exist"""
+    if isinstance(error, AuthApiError) and (
+        error.status == 404 or error.code == "user_not_found"
+    ):
+        return _cache_user_data(user_id, None)
+    # network errors and 5xx answers say nothing about whether it exists
+    logger.error(f"Error getting user {user_id}: {error}")
+    return None
+
+
+def _cached_user_data(
+    user_id: str | UUID,
+) -> tuple[bool, dict[str, Any] | None]:
+    """Whether the profile of `user_id` is cached, and a copy of it"""
+    user_data = _user_data_cache.get(str(user_id), _NOT_CACHED)
+    if user_data is _NOT_CACHED:
+        return False, None
+    # deep copies, the metadata and identities are nested dicts and lists
+    # callers could otherwise alter in the cache
+    cached: dict[str, Any] | None = copy.deepcopy(user_data)
+    return True, cached
+
+
 def get_user_data(user_id: str | UUID) -> dict[str, Any] | None:
     """Get user session from Supabase."""
+    hit, user_data = _cached_user_data(user_id)
+    if hit:
+        return user_data
+
     super_client = get_super_client()
     try:
         user = super_client.auth.admin.get_user_by_id(str(user_id))
-    except AuthError:
-        return None
+    except AuthError as e:
+        return _failed_lookup(user_id, e)
+
+    return _cache_user_data(user_id, user.user.model_dump())
+
+
+async def aget_user_data(user_id: str | UUID) -> dict[str, Any] | None:
+    """Async variant of `get_user_data`, sharing its cache."""
+    hit, user_data = _cached_user_data(user_id)
+    if hit:
+        return user_data
+
+    super_client = await get_async_super_client()
+    try:
+        user = await super_client.auth.admin.get_user_by_id(str(user_id))
+    except AuthError as e:
+        return _failed_lookup(user_id, e)
+
+    return _cache_user_data(user_id, user.user.model_dump())
+
+
+def invalidate_user_data(user_id: str | UUID) -> None:
+    """Drop a cached profile, e.g. once the user was deleted."""
+    _user_data_cache.pop(str(user_id))
+
 
-    user_data: dict[str, Any] = user.user.model_dump()
-    return user_data
+def user_data_cache_stats() -> dict[str, Any]:
+    return _user_data_cache.stats()
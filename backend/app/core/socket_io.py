@@ -1,6 +1,44 @@
+from typing import Protocol
+
 import socketio  # type: ignore
 
+from app.schemas.auth import SioUserSession
+
 sio = socketio.AsyncServer(
     async_mode="asgi",
     cors_allowed_origins="*",
 )
+
+
+class SessionStore(Protocol):
+    """Per-sid connection state of a Socket.IO namespace.
+
+    Handlers mutate the state they got in place and `save` it afterwards,
+    a store keeping the state out of process persists it there.
+    """
+
+    async def get(self, sid: str) -> SioUserSession | None: ...
+
+    async def save(self, sid: str, state: SioUserSession) -> None: ...
+
+    async def remove(self, sid: str) -> None: ...
+
+
+class InMemorySessionStore:
+    """Connection state in a dict of this process, `get` returns the
+    stored object itself, so `save` only matters for new states."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, SioUserSession] = {}
+
+    async def get(self, sid: str) -> SioUserSession | None:
+        return self._states.get(sid)
+
+    async def save(self, sid: str, state: SioUserSession) -> None:
+        self._states[sid] = state
+
+    async def remove(self, sid: str) -> None:
+        self._states.pop(sid, None)
+
+    def __len__(self) -> int:
+        return len(self._states)
@@ -1,9 +1,20 @@
 import uuid
-from collections.abc import Sequence
-from typing import Generic, TypeVar
+from collections.abc import Callable, Sequence
+from functools import partial
+from typing import Any, Generic, TypeVar
 
-from sqlmodel import Session, SQLModel, select
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.orm import Session as ORMSession
+from sqlalchemy.orm import SessionTransaction
+from sqlalchemy.sql.dml import (
+    ReturningDelete,
+    ReturningInsert,
+    ReturningUpdate,
+)
+from sqlmodel import Session, SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.crud.pagination import Page, paginate, to_page
 from app.models.base import InDBBase
 
 ModelType = TypeVar("ModelType", bound=InDBBase)
@@ -11,6 +22,41 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=SQLModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=SQLModel)
 
 
+# callbacks waiting for the commit of their session's transaction
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def on_commit(
+    session: Session | AsyncSession,
+    callback: Callable[[], None],
+    *,
+    committed: bool,
+) -> None:
+    """Run `callback` once the writes it follows are committed, right away
+    when they `committed` already, otherwise when the transaction of
+    `session` commits, so a write that is rolled back never runs it."""
+    if committed:
+        callback()
+    else:
+        session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _run_after_commit(session: ORMSession) -> None:
+    # runs before the committed objects are expired
+    for callback in session.info.pop(_AFTER_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(ORMSession, "after_transaction_end")
+def _discard_after_commit(
+    session: ORMSession, transaction: SessionTransaction
+) -> None:
+    # the outermost transaction ended without a commit, e.g. rolled back
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT, None)
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(
         self,
@@ -23,9 +69,72 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         **Parameters**
 
         * `model`: A SQLModel model class
+
+        Every method has an `a`-prefixed variant taking an `AsyncSession`.
+        Writes are single `INSERT`, `UPDATE` or `DELETE ... RETURNING`
+        statements and commit unless called with `commit=False`, which
+        leaves the transaction open, e.g. for a `transaction` block.
         """
         self.model = model
 
+    def _written(self, db_objs: Sequence[ModelType]) -> None:
+        """Called with the records of every committed create, update or
+        remove, e.g. to invalidate a cache of this model's records."""
+
+    def _on_written(
+        self,
+        session: Session | AsyncSession,
+        db_objs: Sequence[ModelType],
+        *,
+        committed: bool,
+    ) -> None:
+        if db_objs:
+            on_commit(
+                session, partial(self._written, db_objs), committed=committed
+            )
+
+    def _values(
+        self,
+        obj_in: CreateSchemaType,
+        owner_id: uuid.UUID | None,
+    ) -> dict[str, Any]:
+        """Column values of a new record, model defaults included"""
+        obj_data = obj_in.model_dump()
+        if owner_id is not None:
+            obj_data["owner_id"] = owner_id
+        return self.model(**obj_data).model_dump()
+
+    def _insert_statement(self) -> ReturningInsert[tuple[ModelType]]:
+        # a multi-row INSERT ... RETURNING does not guarantee the VALUES
+        # order, the id insert sentinel lets SQLAlchemy restore it while
+        # still batching the rows
+        return insert(self.model).returning(
+            self.model, sort_by_parameter_order=True
+        )
+
+    def _update_statement(
+        self,
+        id: uuid.UUID,
+        update_data: dict[str, Any],
+    ) -> ReturningUpdate[tuple[ModelType]]:
+        return (
+            update(self.model)
+            .where(col(self.model.id) == id)
+            .values(**update_data)
+            .returning(self.model)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    def _delete_statement(
+        self, ids: Sequence[uuid.UUID]
+    ) -> ReturningDelete[tuple[ModelType]]:
+        return (
+            delete(self.model)
+            .where(col(self.model.id).in_(ids))
+            .returning(self.model)
+            .execution_options(synchronize_session="fetch")
+        )
+
     def get(
         self,
         session: Session,
@@ -49,39 +158,96 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = session.exec(statement)
         return result.all()
 
+    def _page_statement(
+        self,
+        statement: Any,
+        cursor: str | None,
+        limit: int,
+    ) -> Any:
+        return paginate(
+            statement,
+            self.model.created_at,
+            self.model.id,
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def _to_page(
+        self,
+        records: Sequence[ModelType],
+        limit: int,
+    ) -> Page[ModelType]:
+        return to_page(
+            records, limit, lambda record: (record.created_at, record.id)
+        )
+
+    def get_page(
+        self,
+        session: Session,
+        *,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[ModelType]:
+        """Get multiple records with keyset pagination, newest first"""
+        statement = self._page_statement(select(self.model), cursor, limit)
+        return self._to_page(session.exec(statement).all(), limit)
+
     def create(
         self,
         session: Session,
         *,
         obj_in: CreateSchemaType,
         owner_id: uuid.UUID | None = None,
+        commit: bool = True,
     ) -> ModelType:
         """Create new record with optional owner_id"""
-        obj_data = obj_in.model_dump()
-        if owner_id is not None:
-            obj_data["owner_id"] = owner_id
-        db_obj = self.model(**obj_data)
-        session.add(db_obj)
-        session.commit()
-        session.refresh(db_obj)
+        db_obj = session.scalars(
+            self._insert_statement(), [self._values(obj_in, owner_id)]
+        ).one()
+        if commit:
+            session.commit()
+        self._on_written(session, [db_obj], committed=commit)
         return db_obj
 
+    def create_many(
+        self,
+        session: Session,
+        *,
+        obj_in: Sequence[CreateSchemaType],
+        owner_id: uuid.UUID | None = None,
+        commit: bool = True,
+    ) -> Sequence[ModelType]:
+        """Create new records with optional owner_id, in `obj_in` order"""
+        if not obj_in:
+            return []
+        values = [self._values(obj, owner_id) for obj in obj_in]
+        db_objs = session.scalars(self._insert_statement(), values).all()
+        if commit:
+            session.commit()
+        self._on_written(session, db_objs, committed=commit)
+        return db_objs
+
     def update(
         self,
         session: Session,
         *,
         id: uuid.UUID,
         obj_in: UpdateSchemaType,
+        commit: bool = True,
     ) -> ModelType | None:
         """Update existing record"""
-        db_obj = self.get(session, id=id)
-        if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            db_obj.sqlmodel_update(update_data)
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if not update_data:
+            return self.get(session, id=id)
 
-            session.add(db_obj)
+        db_obj = session.scalars(
+            self._update_statement(id, update_data)
+        ).one_or_none()
+        if commit:
             session.commit()
-            session.refresh(db_obj)
+        self._on_written(
+            session, [db_obj] if db_obj is not None else [], committed=commit
+        )
         return db_obj
 
     def remove(
@@ -89,10 +255,159 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         session: Session,
         *,
         id: uuid.UUID,
+        commit: bool = True,
     ) -> ModelType | None:
         """Remove a record"""
-        obj = self.get(session, id=id)
-        if obj:
-            session.delete(obj)
+        db_obj = session.scalars(self._delete_statement([id])).one_or_none()
+        if commit:
             session.commit()
-        return obj
+        self._on_written(
+            session, [db_obj] if db_obj is not None else [], committed=commit
+        )
+        return db_obj
+
+    def remove_many(
+        self,
+        session: Session,
+        *,
+        ids: Sequence[uuid.UUID],
+        commit: bool = True,
+    ) -> Sequence[ModelType]:
+        """Remove records, the ones that existed are returned"""
+        if not ids:
+            return []
+        db_objs = session.scalars(self._delete_statement(ids)).all()
+        if commit:
+            session.commit()
+        self._on_written(session, db_objs, committed=commit)
+        return db_objs
+
+    async def aget(
+        self,
+        session: AsyncSession,
+        *,
+        id: uuid.UUID,
+    ) -> ModelType | None:
+        """Get a single record by id"""
+        statement = select(self.model).where(self.model.id == id)
+        result = await session.exec(statement)
+        return result.one_or_none()
+
+    async def aget_multi(
+        self,
+        session: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Sequence[ModelType]:
+        """Get multiple records with pagination"""
+        statement = select(self.model).offset(skip).limit(limit)
+        result = await session.exec(statement)
+        return result.all()
+
+    async def aget_page(
+        self,
+        session: AsyncSession,
+        *,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[ModelType]:
+        """Get multiple records with keyset pagination, newest first"""
+        statement = self._page_statement(select(self.model), cursor, limit)
+        return self._to_page((await session.exec(statement)).all(), limit)
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: CreateSchemaType,
+        owner_id: uuid.UUID | None = None,
+        commit: bool = True,
+    ) -> ModelType:
+        """Create new record with optional owner_id"""
+        db_obj = (
+            await session.scalars(
+                self._insert_statement(), [self._values(obj_in, owner_id)]
+            )
+        ).one()
+        if commit:
+            await session.commit()
+        self._on_written(session, [db_obj], committed=commit)
+        return db_obj
+
+    async def acreate_many(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: Sequence[CreateSchemaType],
+        owner_id: uuid.UUID | None = None,
+        commit: bool = True,
+    ) -> Sequence[ModelType]:
+        """Create new records with optional owner_id, in `obj_in` order"""
+        if not obj_in:
+            return []
+        values = [self._values(obj, owner_id) for obj in obj_in]
+        db_objs = (
+            await session.scalars(self._insert_statement(), values)
+        ).all()
+        if commit:
+            await session.commit()
+        self._on_written(session, db_objs, committed=commit)
+        return db_objs
+
+    async def aupdate(
+        self,
+        session: AsyncSession,
+        *,
+        id: uuid.UUID,
+        obj_in: UpdateSchemaType,
+        commit: bool = True,
+    ) -> ModelType | None:
+        """Update existing record"""
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.aget(session, id=id)
+
+        db_obj = (
+            await session.scalars(self._update_statement(id, update_data))
+        ).one_or_none()
+        if commit:
+            await session.commit()
+        self._on_written(
+            session, [db_obj] if db_obj is not None else [], committed=commit
+        )
+        return db_obj
+
+    async def aremove(
+        self,
+        session: AsyncSession,
+        *,
+        id: uuid.UUID,
+        commit: bool = True,
+    ) -> ModelType | None:
+        """Remove a record"""
+        db_obj = (
+            await session.scalars(self._delete_statement([id]))
+        ).one_or_none()
+        if commit:
+            await session.commit()
+        self._on_written(
+            session, [db_obj] if db_obj is not None else [], committed=commit
+        )
+        return db_obj
+
+    async def aremove_many(
+        self,
+        session: AsyncSession,
+        *,
+        ids: Sequence[uuid.UUID],
+        commit: bool = True,
+    ) -> Sequence[ModelType]:
+        """Remove records, the ones that existed are returned"""
+        if not ids:
+            return []
+        db_objs = (await session.scalars(self._delete_statement(ids))).all()
+        if commit:
+            await session.commit()
+        self._on_written(session, db_objs, committed=commit)
+        return db_objs
@@ -1,6 +1,7 @@
 from uuid import UUID
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models.auth_code import AuthCode, AuthCodeCreate, AuthCodeUpdate
@@ -19,11 +20,29 @@ class CRUDAuthCode(
         *,
         obj_in: AuthCodeCreate,
         owner_id: UUID | None = None,
+        commit: bool = True,
     ) -> AuthCode:
         if owner_id is None:
             raise ValueError("owner_id is required")
 
-        return super().create(session, obj_in=obj_in, owner_id=owner_id)
+        return super().create(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: AuthCodeCreate,
+        owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> AuthCode:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        return await super().acreate(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
 
     def get_by_code(self, session: Session, *, code: str) -> AuthCode | None:
         """Get a single record by code"""
@@ -31,5 +50,16 @@ class CRUDAuthCode(
         result = session.exec(statement)
         return result.one_or_none()
 
+    async def aget_by_code(
+        self,
+        session: AsyncSession,
+        *,
+        code: str,
+    ) -> AuthCode | None:
+        """Get a single record by code"""
+        statement = select(self.model).where(self.model.code == code)
+        result = await session.exec(statement)
+        return result.one_or_none()
+
 
 auth_code = CRUDAuthCode(AuthCode)
@@ -1,18 +1,61 @@
+from collections.abc import Callable, Mapping, Sequence
+from functools import partial
+from typing import Any
 from uuid import UUID
 
-from sqlmodel import Session, text
+from pgvector.sqlalchemy import Vector  # type: ignore
+from pgvector.utils import Vector as PGVector  # type: ignore
+from sqlalchemy import Dialect, bindparam, union
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
 
 from app.core.config import settings
-from app.crud.base import CRUDBase
+from app.core.face_index import face_index, fuse_distances
+from app.crud.base import CRUDBase, on_commit
 from app.models.face import (
     Face,
     FaceCreate,
+    FaceFusedMatch,
     FaceMatch,
     FaceOrientation,
     FaceUpdate,
 )
 
 
+class BoundVector(Vector):  # type: ignore
+    """pgvector column type for query parameters.
+
+    Values are handed to psycopg as `pgvector.Vector` objects instead of
+    being formatted as text, so the adapter registered on the connection
+    sends them in binary format.
+    """
+
+    cache_ok = True
+
+    def bind_processor(
+        self, dialect: Dialect
+    ) -> Callable[[Any], PGVector | None]:
+        def process(value: Any) -> PGVector | None:
+            if value is None or isinstance(value, PGVector):
+                return value
+            return PGVector(value)
+
+        return process
+
+
+def _on_commit(
+    session: Session | AsyncSession,
+    update: Callable[[], None],
+    *,
+    committed: bool,
+) -> None:
+    """Apply `update` to the face index once the write is committed, see
+    `on_commit`."""
+    if face_index.active:
+        on_commit(session, update, committed=committed)
+
+
 class CRUDFace(CRUDBase[Face, FaceCreate, FaceUpdate]):
     def create(
         self,
@@ -20,11 +63,141 @@ class CRUDFace(CRUDBase[Face, FaceCreate, FaceUpdate]):
         *,
         obj_in: FaceCreate,
         owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> Face:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        db_obj = super().create(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+        _on_commit(session, partial(face_index.add, db_obj), committed=commit)
+        return db_obj
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: FaceCreate,
+        owner_id: UUID | None = None,
+        commit: bool = True,
     ) -> Face:
         if owner_id is None:
             raise ValueError("owner_id is required")
 
-        return super().create(session, obj_in=obj_in, owner_id=owner_id)
+        db_obj = await super().acreate(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+        _on_commit(session, partial(face_index.add, db_obj), committed=commit)
+        return db_obj
+
+    def create_many(
+        self,
+        session: Session,
+        *,
+        obj_in: Sequence[FaceCreate],
+        owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> Sequence[Face]:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        db_objs = super().create_many(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+        _on_commit(
+            session, partial(face_index.add, *db_objs), committed=commit
+        )
+        return db_objs
+
+    async def acreate_many(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: Sequence[FaceCreate],
+        owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> Sequence[Face]:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        db_objs = await super().acreate_many(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+        _on_commit(
+            session, partial(face_index.add, *db_objs), committed=commit
+        )
+        return db_objs
+
+    def remove(
+        self,
+        session: Session,
+        *,
+        id: UUID,
+        commit: bool = True,
+    ) -> Face | None:
+        db_obj = super().remove(session, id=id, commit=commit)
+        _on_commit(session, partial(face_index.remove, id), committed=commit)
+        return db_obj
+
+    async def aremove(
+        self,
+        session: AsyncSession,
+        *,
+        id: UUID,
+        commit: bool = True,
+    ) -> Face | None:
+        db_obj = await super().aremove(session, id=id, commit=commit)
+        _on_commit(session, partial(face_index.remove, id), committed=commit)
+        return db_obj
+
+    def remove_many(
+        self,
+        session: Session,
+        *,
+        ids: Sequence[UUID],
+        commit: bool = True,
+    ) -> Sequence[Face]:
+        db_objs = super().remove_many(session, ids=ids, commit=commit)
+        _on_commit(session, partial(face_index.remove, *ids), committed=commit)
+        return db_objs
+
+    async def aremove_many(
+        self,
+        session: AsyncSession,
+        *,
+        ids: Sequence[UUID],
+        commit: bool = True,
+    ) -> Sequence[Face]:
+        db_objs = await super().aremove_many(session, ids=ids, commit=commit)
+        _on_commit(session, partial(face_index.remove, *ids), committed=commit)
+        return db_objs
+
+    def _match_statement(
+        self,
+        embedding: list[float],
+        face_orientation: FaceOrientation,
+        threshold: float,
+        k: int,
+    ) -> Select[tuple[UUID, float]]:
+        embedding_column = getattr(
+            self.model, f"{face_orientation.value}_embedding"
+        )
+        distance = embedding_column.l2_distance(
+            bindparam("embedding", embedding, type_=BoundVector(128))
+        ).label("distance")
+        candidates = (
+            select(self.model.owner_id, distance)
+            .order_by(distance)
+            .limit(bindparam("k", k))
+            .subquery()
+        )
+        return (
+            select(candidates.c.owner_id, candidates.c.distance)
+            .where(candidates.c.distance < bindparam("threshold", threshold))
+            .order_by(candidates.c.distance)
+            .limit(1)
+        )
 
     def face_match(
         self,
@@ -33,25 +206,164 @@ class CRUDFace(CRUDBase[Face, FaceCreate, FaceUpdate]):
         embedding: list[float],
         face_orientation: FaceOrientation = FaceOrientation.CENTER,
         threshold: float = settings.FACE_MATCH_THRESHOLD,
+        k: int = 1,
     ) -> FaceMatch | None:
-        statement = text(
-            f"""
-select *
-from (
-    select f.owner_id, f.{face_orientation.value}_embedding <-> '[{",".join(map(str, embedding))}]' as distance
-    from face f
-) a
-where distance < {threshold}
-order by distance asc
-limit 1
-"""
-        )
-        result = session.execute(statement).first()  # type: ignore
+        """Get the closest face within `threshold`.
+
+        The `k` nearest faces are fetched with an index ordered scan first,
+        the threshold is only applied to those candidates: a `where` on the
+        distance before `order by ... limit` cannot be served by the HNSW
+        index and scans the whole table.
+
+        Everything that varies between calls is a bound parameter, so the
+        statement text is constant and psycopg can prepare it server side.
+
+        With `FACE_MATCH_BACKEND="local"` the in-process face index is
+        searched first, the database is only queried when it has no match,
+        e.g. for a face enrolled by another worker since the last sync.
+        """
+        if face_index.active:
+            match = face_index.search(embedding, face_orientation, threshold)
+            if match is not None:
+                return match
+
+        result = session.exec(
+            self._match_statement(embedding, face_orientation, threshold, k)
+        ).first()
 
         if result is None:
             return None
 
         return FaceMatch(owner_id=result[0], distance=result[1])
 
+    async def aface_match(
+        self,
+        session: AsyncSession,
+        *,
+        embedding: list[float],
+        face_orientation: FaceOrientation = FaceOrientation.CENTER,
+        threshold: float = settings.FACE_MATCH_THRESHOLD,
+        k: int = 1,
+    ) -> FaceMatch | None:
+        """Async variant of `face_match`"""
+        if face_index.active:
+            match = face_index.search(embedding, face_orientation, threshold)
+            if match is not None:
+                return match
+
+        result = (
+            await session.exec(
+                self._match_statement(
+                    embedding, face_orientation, threshold, k
+                )
+            )
+        ).first()
+
+        if result is None:
+            return None
+
+        return FaceMatch(owner_id=result[0], distance=result[1])
+
+    def _fused_statement(
+        self,
+        embeddings: Mapping[FaceOrientation, list[float]],
+        k: int,
+    ) -> Select[tuple[Any, ...]]:
+        """Owner and distance in every captured orientation, in
+        `embeddings` order, of the `k` nearest faces per orientation."""
+        distances = {
+            orientation: getattr(
+                self.model, f"{orientation.value}_embedding"
+            ).l2_distance(
+                bindparam(
+                    f"{orientation.value}_embedding",
+                    embedding,
+                    type_=BoundVector(128),
+                )
+            )
+            for orientation, embedding in embeddings.items()
+        }
+        candidates = union(
+            *(
+                select(self.model.id)
+                .order_by(distance)
+                .limit(bindparam("k", k))
+                for distance in distances.values()
+            )
+        ).subquery()
+        statement: Select[tuple[Any, ...]] = select(
+            self.model.owner_id,
+            *(
+                distance.label(f"{orientation.value}_distance")
+                for orientation, distance in distances.items()
+            ),
+        ).where(col(self.model.id).in_(select(candidates.c.id)))
+        return statement
+
+    @staticmethod
+    def _fuse_rows(
+        embeddings: Mapping[FaceOrientation, list[float]],
+        rows: Sequence[Any],
+        threshold: float,
+        k: int,
+    ) -> list[FaceFusedMatch]:
+        return fuse_distances(
+            owner_ids=[row[0] for row in rows],
+            distances={
+                orientation: [row[i] for row in rows]
+                for i, orientation in enumerate(embeddings, start=1)
+            },
+            threshold=threshold,
+            k=k,
+        )
+
+    def face_match_fused(
+        self,
+        session: Session,
+        *,
+        embeddings: Mapping[FaceOrientation, list[float]],
+        threshold: float = settings.FACE_MATCH_THRESHOLD,
+        k: int = settings.FACE_MATCH_CANDIDATES,
+    ) -> list[FaceFusedMatch]:
+        """Get the closest faces over several captured orientations.
+
+        The `k` nearest faces of every captured orientation are fetched
+        with index ordered scans, their distances in all captured
+        orientations are computed in the same statement and fused by
+        `fuse_distances`, so any number of orientations costs one round
+        trip.
+
+        Returns:
+            Up to `k` matches within `threshold`, closest first
+        """
+        if not embeddings:
+            return []
+
+        if face_index.active:
+            if matches := face_index.search_fused(embeddings, threshold, k):
+                return matches
+
+        rows = session.exec(self._fused_statement(embeddings, k)).all()
+        return self._fuse_rows(embeddings, rows, threshold, k)
+
+    async def aface_match_fused(
+        self,
+        session: AsyncSession,
+        *,
+        embeddings: Mapping[FaceOrientation, list[float]],
+        threshold: float = settings.FACE_MATCH_THRESHOLD,
+        k: int = settings.FACE_MATCH_CANDIDATES,
+    ) -> list[FaceFusedMatch]:
+        """Async variant of `face_match_fused`"""
+        if not embeddings:
+            return []
+
+        if face_index.active:
+            if matches := face_index.search_fused(embeddings, threshold, k):
+                return matches
+
+        rows = (await session.exec(self._fused_statement(embeddings, k))).all()
+        return self._fuse_rows(embeddings, rows, threshold, k)
+
 
 face = CRUDFace(Face)
@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models.oauth_refresh_token import (
@@ -26,5 +27,16 @@ class CRUDOAuthRefreshToken(
         result = session.exec(statement)
         return result.one_or_none()
 
+    async def aget_by_token(
+        self,
+        session: AsyncSession,
+        *,
+        token: str,
+    ) -> OAuthRefreshToken | None:
+        """Get a single record by token"""
+        statement = select(self.model).where(self.model.token == token)
+        result = await session.exec(statement)
+        return result.one_or_none()
+
 
 oauth_refresh_token = CRUDOAuthRefreshToken(OAuthRefreshToken)
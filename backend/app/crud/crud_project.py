@@ -2,23 +2,49 @@ from collections.abc import Sequence
 from uuid import UUID
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.crud.base import CRUDBase
+from app.crud.crud_trusted_origin import invalidate_origin_checks
+from app.crud.pagination import Page
 from app.models.project import Project, ProjectCreate, ProjectUpdate
 
 
 class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
+    def _written(self, db_objs: Sequence[Project]) -> None:
+        # the cached checks of the project, e.g. of a removed one whose
+        # trusted origins were deleted with it
+        invalidate_origin_checks()
+
     def create(
         self,
         session: Session,
         *,
         obj_in: ProjectCreate,
         owner_id: UUID | None = None,
+        commit: bool = True,
     ) -> Project:
         if owner_id is None:
             raise ValueError("owner_id is required")
 
-        return super().create(session, obj_in=obj_in, owner_id=owner_id)
+        return super().create(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: ProjectCreate,
+        owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> Project:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        return await super().acreate(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
 
     def get_multi_by_owner(
         self,
@@ -37,5 +63,20 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         result = session.exec(statement)
         return result.all()
 
+    def get_page_by_owner(
+        self,
+        session: Session,
+        *,
+        owner_id: UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[Project]:
+        statement = self._page_statement(
+            select(self.model).where(self.model.owner_id == owner_id),
+            cursor,
+            limit,
+        )
+        return self._to_page(session.exec(statement).all(), limit)
+
 
 project = CRUDProject(Project)
@@ -1,14 +1,41 @@
 from collections.abc import Sequence
+from enum import Enum
+from typing import Any
 from uuid import UUID
 
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.pagination import Page
+from app.models.project import Project
 from app.models.trusted_origin import (
     TrustedOrigin,
     TrustedOriginCreate,
     TrustedOriginUpdate,
 )
+from app.utils.cache import TTLCache
+
+
+class OriginCheck(str, Enum):
+    """Outcome of `CRUDTrustedOrigin.check_origin`"""
+
+    TRUSTED = "trusted"
+    INVALID_PROJECT = "invalid_project"
+    INVALID_ORIGIN = "invalid_origin"
+
+
+# (project_id, origin) -> OriginCheck
+_origin_checks: TTLCache[tuple[UUID, str], OriginCheck] = TTLCache(
+    maxsize=settings.TRUSTED_ORIGIN_CACHE_SIZE,
+    ttl=settings.TRUSTED_ORIGIN_CACHE_TTL,
+)
+
+
+def invalidate_origin_checks() -> None:
+    """Drop the cached checks, e.g. once a project or an origin changed."""
+    _origin_checks.clear()
 
 
 class CRUDTrustedOrigin(
@@ -24,11 +51,85 @@ class CRUDTrustedOrigin(
         *,
         obj_in: TrustedOriginCreate,
         owner_id: UUID | None = None,
+        commit: bool = True,
     ) -> TrustedOrigin:
         if owner_id is None:
             raise ValueError("owner_id is required")
 
-        return super().create(session, obj_in=obj_in, owner_id=owner_id)
+        return super().create(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: TrustedOriginCreate,
+        owner_id: UUID | None = None,
+        commit: bool = True,
+    ) -> TrustedOrigin:
+        if owner_id is None:
+            raise ValueError("owner_id is required")
+
+        return await super().acreate(
+            session, obj_in=obj_in, owner_id=owner_id, commit=commit
+        )
+
+    def _written(self, db_objs: Sequence[TrustedOrigin]) -> None:
+        # an update does not return the (project_id, name) it replaced
+        invalidate_origin_checks()
+
+    def check_origin(
+        self,
+        session: Session,
+        *,
+        project_id: UUID,
+        origin: str,
+    ) -> OriginCheck:
+        """Check that the project exists and trusts `origin`.
+
+        Outcomes are cached per process, negative ones for a shorter time.
+        Committed writes through this CRUD object or the project one drop
+        the cache, writes made elsewhere, e.g. through Supabase, are seen
+        once the entry expires.
+        On a miss, the project and the origin are looked up with a single
+        join.
+        """
+        key = (project_id, origin)
+        check = _origin_checks.get(key)
+        if check is not None:
+            return check
+
+        statement = (
+            select(Project.id, self.model.id)
+            .outerjoin(
+                self.model,
+                (col(self.model.project_id) == Project.id)
+                & (col(self.model.name) == origin),
+            )
+            .where(Project.id == project_id)
+        )
+        row = session.exec(statement).first()
+        if row is None:
+            check = OriginCheck.INVALID_PROJECT
+        elif row[1] is None:
+            check = OriginCheck.INVALID_ORIGIN
+        else:
+            check = OriginCheck.TRUSTED
+        _origin_checks.set(
+            key,
+            check,
+            ttl=(
+                None
+                if check is OriginCheck.TRUSTED
+                else settings.TRUSTED_ORIGIN_NEGATIVE_CACHE_TTL
+            ),
+        )
+        return check
+
+    @staticmethod
+    def cache_stats() -> dict[str, Any]:
+        return _origin_checks.stats()
 
     def get_by_name_and_project(
         self,
@@ -45,6 +146,21 @@ class CRUDTrustedOrigin(
         result = session.exec(statement)
         return result.one_or_none()
 
+    async def aget_by_name_and_project(
+        self,
+        session: AsyncSession,
+        *,
+        name: str,
+        project_id: UUID,
+    ) -> TrustedOrigin | None:
+        """Get a single record by name"""
+        statement = select(self.model).where(
+            self.model.name == name,
+            self.model.project_id == project_id,
+        )
+        result = await session.exec(statement)
+        return result.one_or_none()
+
     def get_multi_by_owner_and_project(
         self,
         session: Session,
@@ -66,5 +182,24 @@ class CRUDTrustedOrigin(
         result = session.exec(statement)
         return result.all()
 
+    def get_page_by_owner_and_project(
+        self,
+        session: Session,
+        *,
+        owner_id: UUID,
+        project_id: UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[TrustedOrigin]:
+        statement = self._page_statement(
+            select(self.model).where(
+                self.model.owner_id == owner_id,
+                self.model.project_id == project_id,
+            ),
+            cursor,
+            limit,
+        )
+        return self._to_page(session.exec(statement).all(), limit)
+
 
 trusted_origin = CRUDTrustedOrigin(TrustedOrigin)
@@ -1,8 +1,12 @@
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement, delete, insert, update
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.crud.pagination import Page, paginate, to_page
 from app.models.user_project_link import (
     UserProjectLink,
     UserProjectLinkCreate,
@@ -11,6 +15,39 @@ from app.models.user_project_link import (
 
 
 class CRUDUserProjectLink:
+    """Writes are single `INSERT`, `UPDATE` or `DELETE ... RETURNING`
+    statements, like in `CRUDBase`."""
+
+    @staticmethod
+    def _key(owner_id: UUID, project_id: UUID) -> ColumnElement[bool]:
+        return (col(UserProjectLink.owner_id) == owner_id) & (
+            col(UserProjectLink.project_id) == project_id
+        )
+
+    @staticmethod
+    def _page_statement(owner_id: UUID, cursor: str | None, limit: int) -> Any:
+        # project_id is unique per owner, it breaks created_at ties
+        return paginate(
+            select(UserProjectLink).where(
+                UserProjectLink.owner_id == owner_id
+            ),
+            UserProjectLink.created_at,
+            UserProjectLink.project_id,
+            cursor=cursor,
+            limit=limit,
+        )
+
+    @staticmethod
+    def _to_page(
+        records: Sequence[UserProjectLink],
+        limit: int,
+    ) -> Page[UserProjectLink]:
+        return to_page(
+            records,
+            limit,
+            lambda record: (record.created_at, record.project_id),
+        )
+
     def get(
         self,
         session: Session,
@@ -44,20 +81,39 @@ class CRUDUserProjectLink:
         result = session.exec(statement)
         return result.all()
 
+    def get_page(
+        self,
+        session: Session,
+        *,
+        owner_id: UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[UserProjectLink]:
+        """Get multiple records for an owner with keyset pagination, newest
+        first"""
+        statement = self._page_statement(owner_id, cursor, limit)
+        return self._to_page(session.exec(statement).all(), limit)
+
     def create(
         self,
         session: Session,
         *,
         owner_id: UUID,
         obj_in: UserProjectLinkCreate,
+        commit: bool = True,
     ) -> UserProjectLink:
         """Create new record"""
-        db_obj = UserProjectLink(
-            **dict(owner_id=owner_id, **obj_in.model_dump())
-        )
-        session.add(db_obj)
-        session.commit()
-        session.refresh(db_obj)
+        db_obj = session.scalars(
+            insert(UserProjectLink)
+            .values(
+                UserProjectLink(
+                    **dict(owner_id=owner_id, **obj_in.model_dump())
+                ).model_dump()
+            )
+            .returning(UserProjectLink)
+        ).one()
+        if commit:
+            session.commit()
         return db_obj
 
     def update(
@@ -67,16 +123,18 @@ class CRUDUserProjectLink:
         owner_id: UUID,
         project_id: UUID,
         obj_in: UserProjectLinkUpdate,
+        commit: bool = True,
     ) -> UserProjectLink | None:
         """Update existing record"""
-        db_obj = self.get(session, owner_id=owner_id, project_id=project_id)
-        if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            db_obj.sqlmodel_update(update_data)
-
-            session.add(db_obj)
+        db_obj = session.scalars(
+            update(UserProjectLink)
+            .where(self._key(owner_id, project_id))
+            .values(**obj_in.model_dump(exclude_unset=True))
+            .returning(UserProjectLink)
+            .execution_options(synchronize_session="fetch")
+        ).one_or_none()
+        if commit:
             session.commit()
-            session.refresh(db_obj)
         return db_obj
 
     def remove(
@@ -85,13 +143,132 @@ class CRUDUserProjectLink:
         *,
         owner_id: UUID,
         project_id: UUID,
+        commit: bool = True,
     ) -> UserProjectLink | None:
         """Remove a record"""
-        obj = self.get(session, owner_id=owner_id, project_id=project_id)
-        if obj:
-            session.delete(obj)
+        db_obj = session.scalars(
+            delete(UserProjectLink)
+            .where(self._key(owner_id, project_id))
+            .returning(UserProjectLink)
+            .execution_options(synchronize_session="fetch")
+        ).one_or_none()
+        if commit:
             session.commit()
-        return obj
+        return db_obj
+
+    async def aget(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        project_id: UUID,
+    ) -> UserProjectLink | None:
+        """Get a single record by user_id and project_id"""
+        statement = select(UserProjectLink).where(
+            UserProjectLink.owner_id == owner_id,
+            UserProjectLink.project_id == project_id,
+        )
+        result = await session.exec(statement)
+        return result.one_or_none()
+
+    async def aget_multi(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Sequence[UserProjectLink]:
+        """Get multiple records for an owner with pagination"""
+        statement = (
+            select(UserProjectLink)
+            .where(UserProjectLink.owner_id == owner_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await session.exec(statement)
+        return result.all()
+
+    async def aget_page(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Page[UserProjectLink]:
+        """Get multiple records for an owner with keyset pagination, newest
+        first"""
+        statement = self._page_statement(owner_id, cursor, limit)
+        return self._to_page((await session.exec(statement)).all(), limit)
+
+    async def acreate(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        obj_in: UserProjectLinkCreate,
+        commit: bool = True,
+    ) -> UserProjectLink:
+        """Create new record"""
+        db_obj = (
+            await session.scalars(
+                insert(UserProjectLink)
+                .values(
+                    UserProjectLink(
+                        **dict(owner_id=owner_id, **obj_in.model_dump())
+                    ).model_dump()
+                )
+                .returning(UserProjectLink)
+            )
+        ).one()
+        if commit:
+            await session.commit()
+        return db_obj
+
+    async def aupdate(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        project_id: UUID,
+        obj_in: UserProjectLinkUpdate,
+        commit: bool = True,
+    ) -> UserProjectLink | None:
+        """Update existing record"""
+        db_obj = (
+            await session.scalars(
+                update(UserProjectLink)
+                .where(self._key(owner_id, project_id))
+                .values(**obj_in.model_dump(exclude_unset=True))
+                .returning(UserProjectLink)
+                .execution_options(synchronize_session="fetch")
+            )
+        ).one_or_none()
+        if commit:
+            await session.commit()
+        return db_obj
+
+    async def aremove(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: UUID,
+        project_id: UUID,
+        commit: bool = True,
+    ) -> UserProjectLink | None:
+        """Remove a record"""
+        db_obj = (
+            await session.scalars(
+                delete(UserProjectLink)
+                .where(self._key(owner_id, project_id))
+                .returning(UserProjectLink)
+                .execution_options(synchronize_session="fetch")
+            )
+        ).one_or_none()
+        if commit:
+            await session.commit()
+        return db_obj
 
 
 user_project_link = CRUDUserProjectLink()
@@ -0,0 +1,83 @@
+import base64
+import binascii
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any, Generic, NamedTuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import literal, tuple_
+from sqlmodel import col
+
+from app.utils.errors import InvalidCursor
+
+T = TypeVar("T")
+
+
+class Page(NamedTuple, Generic[T]):
+    """One page of records, newest first.
+
+    `next_cursor` is passed back to get the following page, it is None on
+    the last page.
+    """
+
+    items: list[T]
+    next_cursor: str | None
+
+
+def encode_cursor(created_at: datetime, key: UUID) -> str:
+    """Opaque cursor pointing after the record with (created_at, key)"""
+    raw = f"{created_at.isoformat()}|{key}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, key = raw.decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(key)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def paginate(
+    statement: Any,
+    created_at_column: Any,
+    key_column: Any,
+    *,
+    cursor: str | None,
+    limit: int,
+) -> Any:
+    """Keyset pagination of `statement` on (created_at, key), newest first.
+
+    Unlike `OFFSET`, the cost of a page does not grow with its position as
+    long as an index ends with (created_at, key), and records inserted
+    meanwhile do not shift the following pages. One record more than
+    `limit` is fetched to tell whether there is a next page.
+    """
+    created_at_column = col(created_at_column)
+    key_column = col(key_column)
+    if cursor is not None:
+        created_at, key = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(created_at_column, key_column)
+            < tuple_(
+                literal(created_at, created_at_column.type),
+                literal(key, key_column.type),
+            )
+        )
+    return statement.order_by(
+        created_at_column.desc(), key_column.desc()
+    ).limit(limit + 1)
+
+
+def to_page(
+    records: Sequence[T],
+    limit: int,
+    cursor_of: Callable[[T], tuple[datetime, UUID]],
+) -> Page[T]:
+    """Page of the records fetched by a `paginate` statement"""
+    items = list(records[:limit])
+    next_cursor = None
+    if items and len(records) > limit:
+        next_cursor = encode_cursor(*cursor_of(items[-1]))
+    return Page(items=items, next_cursor=next_cursor)
@@ -1,4 +1,7 @@
+import asyncio
+import contextlib
 import logging
+import signal
 from collections.abc import AsyncGenerator
 from typing import Any
 
@@ -7,11 +10,17 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 from uvicorn.config import LOGGING_CONFIG
 
 from app.api.main import api_router
 from app.api.routes.ws_no_prefix import AuthNamespace
-from app.core.config import settings
+from app.core.auth import close_super_clients, get_async_super_client
+from app.core.config import reload_settings, settings
+from app.core.db import async_engine, engine
+from app.core.face_index import face_index
+from app.core.inference import inference_executor
+from app.core.reaper import reaper
 from app.core.socket_io import sio
 from app.utils import custom_generate_unique_id
 from app.utils.cache_models import cache_models
@@ -19,14 +28,62 @@ from app.utils.cache_models import cache_models
 logger = logging.getLogger("uvicorn")
 
 
+def _reload_settings() -> None:
+    try:
+        reload_settings()
+    except Exception as e:
+        logger.error(f"Error reloading settings, keeping the old ones: {e}")
+    else:
+        logger.info("Settings reloaded")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """life span events"""
+    face_index_sync: asyncio.Task[None] | None = None
+    reaper_task: asyncio.Task[None] | None = None
+    loop = asyncio.get_running_loop()
     try:
         logger.info("lifespan start")
-        cache_models()
+        if hasattr(signal, "SIGHUP"):  # not on Windows
+            # `kill -HUP` reloads the settings read at call time, e.g.
+            # origins, lifespans and thresholds, without a restart
+            loop.add_signal_handler(signal.SIGHUP, _reload_settings)
+        await get_async_super_client()
+        inference_executor.start(initializer=cache_models)
+        if inference_executor.kind == "thread":
+            # thread workers share the models loaded in this process
+            cache_models()
+        if settings.FACE_MATCH_BACKEND == "local":
+            try:
+                with Session(engine) as session:
+                    await asyncio.to_thread(face_index.load, session)
+            except Exception as e:
+                # face_match uses the database until the sync task loads it
+                logger.error(f"Error loading face index: {e}")
+            face_index_sync = asyncio.create_task(
+                face_index.sync_forever(
+                    lambda: Session(engine),
+                    sync_interval=settings.FACE_INDEX_SYNC_INTERVAL,
+                    reload_interval=settings.FACE_INDEX_RELOAD_INTERVAL,
+                )
+            )
+        if settings.REAPER_ENABLED:
+            reaper_task = asyncio.create_task(
+                reaper.run_forever(interval=settings.REAPER_INTERVAL)
+            )
         yield
     finally:
+        if hasattr(signal, "SIGHUP"):
+            loop.remove_signal_handler(signal.SIGHUP)
+        for task in (face_index_sync, reaper_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        inference_executor.shutdown(wait=False)
+        await async_engine.dispose()
+        await close_super_clients()
         logger.info("lifespan exit")
 
 
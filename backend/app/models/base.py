@@ -12,6 +12,9 @@ class InDBBase(SQLModel):
         primary_key=True,
         sa_column_kwargs={
             "server_default": text("gen_random_uuid()"),
+            # ids are set client side, so multi-row INSERT ... RETURNING
+            # can match the returned rows to their parameters by id
+            "insert_sentinel": True,
         },
     )
 
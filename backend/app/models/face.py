@@ -69,3 +69,10 @@ class FaceOrientation(str, Enum):
     CENTER = "center"
     LEFT = "left"
     RIGHT = "right"
+
+
+class FaceFusedMatch(FaceMatch):
+    """Match over several orientations, `distance` is the fused one."""
+
+    # None where the face was enrolled without that orientation
+    distances: dict[FaceOrientation, float | None]
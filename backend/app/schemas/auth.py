@@ -1,9 +1,9 @@
+from dataclasses import dataclass, field
 from enum import Enum
 from random import choice
 from uuid import UUID
 
-from PIL import Image
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
 from supabase_auth import User, UserAttributes
 
 from app.models.face import FaceCreate, FaceOrientation
@@ -75,8 +75,10 @@ class AuthTypes(str, Enum):
     REGISTER = "register"
 
 
-class SioUserSession(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+@dataclass(slots=True)
+class SioUserSession:
+    """State of one Socket.IO connection, kept by a `SessionStore` and
+    mutated in place by the event handlers."""
 
     user_id: str | None = None
     origin: str | None = None
@@ -84,6 +86,14 @@ class SioUserSession(BaseModel):
     auth_type: AuthTypes | None = None
     code_challenge: str | None = None
     oauth_session_uuid: UUID | None = None
-    liveness_frames: list[Image.Image] = []
+    # project of the OAuth session, resolved by start_auth
+    project_id: UUID | None = None
     face_data: FaceCreate | None = None
-    random_orientation: FaceOrientation = choice(list(FaceOrientation))
+    # login embeddings awaiting a fused match, see FACE_MATCH_MODE
+    captured_embeddings: dict[FaceOrientation, list[float]] = field(
+        default_factory=dict
+    )
+    # drawn per connection
+    random_orientation: FaceOrientation = field(
+        default_factory=lambda: choice(list(FaceOrientation))
+    )
@@ -0,0 +1,81 @@
+import numpy as np
+
+from app.utils.antispoofing.inference import FRAME_SIZE
+
+
+class LivenessFrameBuffer:
+    """
+    Fixed-size ring buffer of preprocessed liveness frames for one client.
+
+    Frames are stored as 3x224x224 float32 arrays in a single preallocated
+    array, a frame is preprocessed straight into its slot or copied there
+    by `push`.
+    """
+
+    def __init__(self, window_size: int, stride: int) -> None:
+        """
+        Args:
+            window_size: Number of frames in a scored sequence.
+            stride: Number of new frames between two scored windows once
+            the buffer is full.
+        """
+        if window_size < 1 or stride < 1:
+            raise ValueError("window_size and stride must be positive")
+
+        self.window_size = window_size
+        self.stride = stride
+        self.last_score: float | None = None
+        self._frames = np.empty(
+            (window_size, 3, FRAME_SIZE, FRAME_SIZE),
+            dtype=np.float32,
+        )
+        self._next = 0
+        self._count = 0
+
+    def slot(self) -> np.ndarray:
+        """
+        Slot the next frame goes into, e.g. the `out` array of
+        `preprocess_frame`, so the frame is written in place.
+
+        The slot still holds the oldest frame until it is overwritten, it
+        becomes part of the window once `advance` is called.
+        """
+        slot: np.ndarray = self._frames[self._next]
+        return slot
+
+    def advance(self) -> np.ndarray | None:
+        """
+        Mark the frame written into `slot` as the newest one.
+
+        Returns:
+            A 1×T×3×224×224 copy of the window, oldest frame first, when it
+            is due for scoring, otherwise None.
+        """
+        self._next = (self._next + 1) % self.window_size
+        self._count += 1
+
+        if self._count < self.window_size:
+            return None
+        if (self._count - self.window_size) % self.stride:
+            return None
+        return self.window()
+
+    def push(self, frame: np.ndarray) -> np.ndarray | None:
+        """
+        Store a preprocessed frame, overwriting the oldest one when full.
+
+        Returns:
+            Same as `advance`
+        """
+        self.slot()[...] = frame
+        return self.advance()
+
+    def window(self) -> np.ndarray:
+        """Copy of the buffered frames in arrival order, with a batch axis."""
+        return np.roll(self._frames, -self._next, axis=0)[np.newaxis]
+
+    def reset(self) -> None:
+        """Drop the buffered frames, e.g. when the client restarts auth."""
+        self._next = 0
+        self._count = 0
+        self.last_score = None
@@ -1,28 +1,137 @@
 import argparse
 import os
 import pathlib
+import threading
+from collections.abc import Sequence
 
+import numpy as np
 import onnxruntime as ort  # type: ignore
-import torch
 from PIL import Image
-from torchvision import transforms
 
 from app.core.config import settings
 
 # -----------------------------------------------------------------------------
 # Pre-processing identical to training
+# (torchvision Resize((224, 224)) -> ToTensor() -> Normalize(mean, std))
 # -----------------------------------------------------------------------------
-_preprocess = transforms.Compose(
-    [
-        transforms.Resize((224, 224)),
-        transforms.ToTensor(),
-        transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]),
+FRAME_SIZE = 224
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(3, 1, 1)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(3, 1, 1)
+
+
+def preprocess_frame(
+    img: Image.Image | np.ndarray,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Transform one frame into a normalized 3x224x224 float32 array.
+
+    Args:
+        img: Frame as a PIL image or an HxWxC uint8 array.
+        out: Optional preallocated 3x224x224 float32 array to write into,
+        e.g. a slice of a batch buffer.
+
+    Returns:
+        `out`, or a new array when `out` is None.
+    """
+    if out is None:
+        out = np.empty((3, FRAME_SIZE, FRAME_SIZE), dtype=np.float32)
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+
+    # same bilinear (antialiased) resize torchvision uses for PIL images
+    pixels = np.asarray(
+        img.convert("RGB").resize(
+            (FRAME_SIZE, FRAME_SIZE), Image.Resampling.BILINEAR
+        )
+    )
+    np.divide(pixels.transpose(2, 0, 1), 255.0, out=out, dtype=np.float32)
+    out -= _MEAN
+    out /= _STD
+    return out
+
+
+def preprocess_sequences(
+    list_of_frame_lists: Sequence[Sequence[Image.Image | np.ndarray]],
+) -> np.ndarray:
+    """
+    Preprocess frame sequences into one contiguous B×T×3×224×224 buffer.
+
+    Shorter sequences are padded with copies of their last frame so they
+    all share the length of the longest one.
+    """
+    max_len = max(len(frames) for frames in list_of_frame_lists)
+    batch = np.empty(
+        (len(list_of_frame_lists), max_len, 3, FRAME_SIZE, FRAME_SIZE),
+        dtype=np.float32,
+    )
+    for seq, frames in zip(batch, list_of_frame_lists, strict=True):
+        if not frames:
+            raise ValueError("Empty frame sequence")
+        for out, img in zip(seq, frames, strict=False):
+            preprocess_frame(img, out=out)
+        seq[len(frames) :] = seq[len(frames) - 1]
+    return batch
+
+
+# -----------------------------------------------------------------------------
+# Shared ONNX Runtime sessions, one per model path
+# -----------------------------------------------------------------------------
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+_sessions: dict[str, ort.InferenceSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_options() -> ort.SessionOptions:
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = settings.LIVENESS_INTRA_OP_THREADS
+    options.inter_op_num_threads = settings.LIVENESS_INTER_OP_THREADS
+    options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS[
+        settings.LIVENESS_GRAPH_OPTIMIZATION_LEVEL
     ]
-)
+    options.enable_cpu_mem_arena = settings.LIVENESS_ENABLE_MEM_ARENA
+    options.enable_mem_pattern = settings.LIVENESS_ENABLE_MEM_PATTERN
+    return options
+
+
+def get_liveness_session(
+    model_path: str | None = None,
+) -> ort.InferenceSession:
+    """
+    Return the process-wide ONNX Runtime session for `model_path`.
 
+    The session is created on first use and shared afterwards,
+    `InferenceSession.run` is safe to call from several threads.
 
-def load_sequence(seq_dir: str) -> torch.Tensor:
-    """Read & transform all frames in `seq_dir`, return Tx3x224x224 tensor."""
+    Args:
+        model_path: Path to the ONNX model, defaults to
+        `settings.LIVENESS_MODEL_PATH`.
+    """
+    path = str(
+        pathlib.Path(model_path or settings.LIVENESS_MODEL_PATH).expanduser()
+    )
+    if (sess := _sessions.get(path)) is not None:
+        return sess
+
+    with _sessions_lock:
+        if (sess := _sessions.get(path)) is None:
+            sess = ort.InferenceSession(
+                path,
+                sess_options=_session_options(),
+                providers=["CPUExecutionProvider"],
+            )
+            _sessions[path] = sess
+    return sess
+
+
+def load_sequence(seq_dir: str) -> list[Image.Image]:
+    """Read all frames in `seq_dir` in file name order."""
     frame_paths = sorted(
         [
             os.path.join(seq_dir, f)
@@ -32,22 +141,7 @@ def load_sequence(seq_dir: str) -> torch.Tensor:
     )
     if not frame_paths:
         raise ValueError(f"No images found in {seq_dir}")
-    frames = [_preprocess(Image.open(p).convert("RGB")) for p in frame_paths]
-    return torch.stack(frames)  # (T, 3, 224, 224)
-
-
-def pad_sequences(tensors, value=0.0):
-    """Pad tensors along time dim so they all share the same length."""
-    lengths = [t.shape[0] for t in tensors]
-    max_len = max(lengths)
-    padded = []
-    for t in tensors:
-        if t.shape[0] == max_len:
-            padded.append(t)
-        else:
-            pad_frames = t[-1:].repeat(max_len - t.shape[0], 1, 1, 1)
-            padded.append(torch.cat([t, pad_frames], dim=0))
-    return torch.stack(padded)  # (B, T, 3, 224, 224)
+    return [Image.open(p).convert("RGB") for p in frame_paths]
 
 
 def parse_args():
@@ -82,27 +176,30 @@ def infer_liveness_from_frames(
     Args:
         list_of_frame_lists: List of frame sequences (each sequence is a list
         of PIL.Image.Image).
-        onnx_model_path: Path to the ONNX model.
 
     Returns:
         List of liveness scores, one per sequence.
     """
-    # Load ONNX model
-    sess = ort.InferenceSession(
-        str(object=pathlib.Path(settings.LIVENESS_MODEL_PATH).expanduser()),
-        providers=["CPUExecutionProvider"],
-    )
+    # Preprocess and pad
+    batch_np = preprocess_sequences(list_of_frame_lists)  # B×T×3×224×224
+
+    return infer_liveness(batch_np)
+
+
+def infer_liveness(batch_np: np.ndarray) -> list[float]:
+    """
+    Run liveness detection on already preprocessed frame sequences.
+
+    Args:
+        batch_np: B×T×3×224×224 float32 array, see `preprocess_sequences`.
+
+    Returns:
+        List of liveness scores, one per sequence.
+    """
+    sess = get_liveness_session()
     input_name = sess.get_inputs()[0].name
     output_name = sess.get_outputs()[0].name
 
-    # Preprocess and pad
-    seq_tensors = [
-        torch.stack([_preprocess(img.convert("RGB")) for img in frames])
-        for frames in list_of_frame_lists
-    ]
-    batch_tensor = pad_sequences(seq_tensors)  # B×T×3×224×224
-    batch_np = batch_tensor.numpy().astype("float32")
-
     # Run inference
     scores = sess.run([output_name], {input_name: batch_np})[0]  # B×1
 
@@ -115,10 +212,7 @@ def main():
     args = parse_args()
 
     # 1) Load ONNX model ------------------------------------------------------
-    sess = ort.InferenceSession(
-        str(pathlib.Path(args.onnx_model).expanduser()),
-        providers=["CPUExecutionProvider"],
-    )
+    sess = get_liveness_session(args.onnx_model)
     input_name = sess.get_inputs()[0].name  # 'input'
     output_name = sess.get_outputs()[0].name  # 'prob'
 
@@ -128,11 +222,11 @@ def main():
         batch_dirs = seq_paths[i : i + args.batch_size]
 
         # read & (optionally) pad clips so they have equal length
-        seq_tensors = [load_sequence(str(d)) for d in batch_dirs]
-        batch_tensor = pad_sequences(seq_tensors)  # B×T×3×224×224
         # ONNX Runtime expects NHWC by default; our export kept NCTHW,
-        # so we only need to convert to numpy
-        batch_np = batch_tensor.numpy().astype("float32")
+        # which is the layout preprocess_sequences writes
+        batch_np = preprocess_sequences(
+            [load_sequence(str(d)) for d in batch_dirs]
+        )  # B×T×3×224×224
 
         # 3) Run inference ----------------------------------------------------
         scores = sess.run([output_name], {input_name: batch_np})[0]  # B×1
@@ -0,0 +1,97 @@
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from deepface import DeepFace  # type: ignore
+from PIL import Image
+
+from app.utils.detection import MODEL_NAME, embed_face, extract_largest_face
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser("Face detection/embedding micro-benchmark")
+    p.add_argument(
+        "--image",
+        type=str,
+        required=True,
+        help="Path to an image containing a face",
+    )
+    p.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="Timed iterations per case",
+    )
+    return p.parse_args()
+
+
+def _timeit(func: Callable[[], Any], iterations: int) -> list[float]:
+    func()  # warm up
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{name:<32} mean={statistics.mean(timings):8.2f}ms "
+        f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    image = Image.open(args.image).convert("RGB")
+
+    face_obj = extract_largest_face(image)
+    if face_obj is None:
+        raise ValueError(f"No face detected in {args.image}")
+    face = face_obj["face"]
+
+    def legacy_represent() -> None:
+        DeepFace.represent(
+            face,
+            model_name=MODEL_NAME,
+            detector_backend="skip",
+            max_faces=1,
+        )
+
+    def legacy_frame() -> None:
+        # detection followed by the two identical `DeepFace.represent`
+        # calls the frame path used to run
+        extract_largest_face(image)
+        legacy_represent()
+        legacy_represent()
+
+    _report(
+        "detection only",
+        _timeit(lambda: extract_largest_face(image), args.iterations),
+    )
+    _report(
+        "embedding only, legacy",
+        _timeit(legacy_represent, args.iterations),
+    )
+    _report(
+        "embedding only, current",
+        _timeit(lambda: embed_face(face), args.iterations),
+    )
+    _report(
+        "frame, legacy (2 embeddings)", _timeit(legacy_frame, args.iterations)
+    )
+    _report(
+        "frame, current (1 embedding)",
+        _timeit(
+            lambda: extract_largest_face(image, embed=True), args.iterations
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
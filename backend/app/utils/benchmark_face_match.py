@@ -0,0 +1,131 @@
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlmodel import Session, text
+
+from app.core.db import engine
+from app.crud import face
+from app.models.face import FaceOrientation
+
+EMBEDDING_DIM = 128
+
+# shape of the query before the HNSW indexes were used, kept for comparison
+LEGACY_STATEMENT = """
+select *
+from (
+    select f.owner_id, f.center_embedding <-> '[{embedding}]' as distance
+    from face f
+) a
+where distance < {threshold}
+order by distance asc
+limit 1
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser("face_match lookup latency benchmark")
+    p.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Numbers of enrolled faces to benchmark",
+    )
+    p.add_argument(
+        "--queries",
+        type=int,
+        default=50,
+        help="Timed lookups per size and query shape",
+    )
+    return p.parse_args()
+
+
+def _random_embedding() -> list[float]:
+    return [random.random() for _ in range(EMBEDDING_DIM)]
+
+
+def _seed(session: Session, size: int) -> None:
+    """Fill a temporary `face` table, shadowing public.face in this
+    connection, with `size` random embeddings and index it like the
+    migrations do."""
+    session.execute(text("drop table if exists pg_temp.face"))
+    session.execute(
+        text("create temp table face (like public.face including defaults)")
+    )
+    session.execute(
+        text(
+            f"""
+insert into face (owner_id, center_embedding)
+select gen_random_uuid(), (
+    select array_agg(random())::vector
+    from generate_series(1, {EMBEDDING_DIM})
+    where g > 0
+)
+from generate_series(1, {size}) g
+"""
+        )
+    )
+    session.execute(
+        text(
+            "create index on face using hnsw (center_embedding vector_l2_ops)"
+        )
+    )
+    session.execute(text("analyze face"))
+    session.commit()
+
+
+def _timeit(func: Callable[[], Any], queries: int) -> list[float]:
+    timings = []
+    for _ in range(queries):
+        started_at = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return sorted(timings)
+
+
+def _report(size: int, name: str, timings: list[float]) -> None:
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{size:>9} faces  {name:<8} mean={statistics.mean(timings):8.2f}ms "
+        f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+
+    with engine.connect() as connection, Session(bind=connection) as session:
+        for size in args.sizes:
+            _seed(session, size)
+
+            def legacy() -> None:
+                session.execute(
+                    text(
+                        LEGACY_STATEMENT.format(
+                            embedding=",".join(map(str, _random_embedding())),
+                            threshold=1_000,
+                        )
+                    )
+                ).first()
+
+            def current() -> None:
+                face.face_match(
+                    session=session,
+                    embedding=_random_embedding(),
+                    face_orientation=FaceOrientation.CENTER,
+                    threshold=1_000,
+                )
+
+            _report(size, "legacy", _timeit(legacy, args.queries))
+            _report(size, "current", _timeit(current, args.queries))
+
+        session.execute(text("drop table if exists pg_temp.face"))
+        session.commit()
+
+
+if __name__ == "__main__":
+    main()
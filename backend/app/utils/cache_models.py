@@ -1,5 +1,7 @@
 from PIL import Image
 
+from app.core.config import settings
+from app.utils.antispoofing.inference import get_liveness_session
 from app.utils.detection import extract_largest_face
 
 
@@ -13,6 +15,8 @@ def cache_models() -> None:
         fake_image,
         embed=True,
     )
+    if settings.LIVENESS_ENABLED:
+        get_liveness_session()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""Check that the CRUD lookups of the OAuth flow are served by indexes.
+
+Every lookup is run once in a transaction that is rolled back, the
+statement it sent is explained with sequential scans disabled. Postgres
+still plans a sequential scan when no index can serve a statement, so the
+check needs no seeded data and fails, with a non-zero exit status, as soon
+as an index is missing.
+
+    python -m app.utils.check_query_plans
+"""
+
+import logging
+import sys
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlmodel import Session, text
+
+from app.core.db import engine
+from app.core.face_index import EMBEDDING_DIM
+from app.crud import (
+    auth_code,
+    face,
+    oauth_refresh_token,
+    project,
+    trusted_origin,
+    user_project_link,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ID = uuid4()
+
+LOOKUPS: dict[str, Callable[[Session], Any]] = {
+    "auth_code.get_by_code": lambda session: auth_code.get_by_code(
+        session, code="code"
+    ),
+    "oauth_refresh_token.get_by_token": (
+        lambda session: oauth_refresh_token.get_by_token(
+            session, token="token"
+        )
+    ),
+    "trusted_origin.get_by_name_and_project": (
+        lambda session: trusted_origin.get_by_name_and_project(
+            session, name="https://example.com", project_id=ID
+        )
+    ),
+    "trusted_origin.check_origin": (
+        lambda session: trusted_origin.check_origin(
+            session, project_id=ID, origin="https://example.com"
+        )
+    ),
+    "user_project_link.get": lambda session: user_project_link.get(
+        session, owner_id=ID, project_id=ID
+    ),
+    "project.get_page_by_owner": lambda session: project.get_page_by_owner(
+        session, owner_id=ID
+    ),
+    "trusted_origin.get_page_by_owner_and_project": (
+        lambda session: trusted_origin.get_page_by_owner_and_project(
+            session, owner_id=ID, project_id=ID
+        )
+    ),
+    "user_project_link.get_page": lambda session: user_project_link.get_page(
+        session, owner_id=ID
+    ),
+    "face.face_match": lambda session: face.face_match(
+        session, embedding=[0.0] * EMBEDDING_DIM
+    ),
+}
+
+
+def explain(session: Session, lookup: Callable[[Session], Any]) -> list[str]:
+    """Plan of every statement `lookup` sends"""
+    statements: list[tuple[str, Any]] = []
+
+    def capture(*args: Any) -> None:
+        statements.append((args[2], args[3]))
+
+    connection = session.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        lookup(session)
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    return [
+        line
+        for statement, parameters in statements
+        for line in connection.exec_driver_sql(
+            f"EXPLAIN {statement}", parameters
+        ).scalars()
+    ]
+
+
+def main() -> None:
+    failed = []
+    with Session(engine) as session:
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, lookup in LOOKUPS.items():
+            plan = explain(session, lookup)
+            if not plan:
+                # e.g. served by a cache, nothing was checked
+                failed.append(name)
+                logger.error("%s sent no statement", name)
+            elif any("Seq Scan" in line for line in plan):
+                failed.append(name)
+                logger.error("%s falls back to a sequential scan", name)
+                logger.error("\n".join(plan))
+            else:
+                logger.info("%s: %s", name, plan[0].strip())
+        session.rollback()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
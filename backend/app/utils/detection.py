@@ -4,7 +4,8 @@ from enum import Enum
 from typing import Any
 
 from deepface import DeepFace  # type: ignore
-from numpy import array
+from deepface.modules import preprocessing  # type: ignore
+from numpy import array, concatenate, ndarray
 from PIL import Image
 
 from app.core.config import settings
@@ -52,8 +53,52 @@ def parse_frame(data: bytes) -> Image.Image:
         raise ValueError("Invalid image data")
 
 
+def decode_frame(data: bytes) -> ndarray:
+    """Parse and fully decode raw image bytes into a pixel array."""
+    image = parse_frame(data)
+    try:
+        return array(image)
+    except Exception:
+        raise ValueError("Invalid image data")
+
+
+def embed_faces(faces: list[ndarray]) -> list[list[float]]:
+    """
+    Embed aligned face crops as returned by `DeepFace.extract_faces`.
+
+    Detection is skipped, the crops are preprocessed the same way as
+    `DeepFace.represent` does and fed to the model in a single batch.
+    """
+    if not faces:
+        return []
+
+    model = DeepFace.build_model(model_name=MODEL_NAME)
+    target_size = model.input_shape
+    batch = concatenate(
+        [
+            preprocessing.normalize_input(
+                preprocessing.resize_image(
+                    # rgb to bgr
+                    img=face[:, :, ::-1],
+                    target_size=(target_size[1], target_size[0]),
+                )
+            )
+            for face in faces
+        ]
+    )
+    embeddings: list[list[float]] = (
+        model.model(batch, training=False).numpy().tolist()
+    )
+    return embeddings
+
+
+def embed_face(face: ndarray) -> list[float]:
+    """Embed a single aligned face crop, see `embed_faces`."""
+    return embed_faces([face])[0]
+
+
 def extract_largest_face(
-    image: Image.Image,
+    image: Image.Image | ndarray,
     anti_spoofing=False,
     embed=False,
 ) -> dict[str, Any] | None:
@@ -61,7 +106,7 @@ def extract_largest_face(
     Extract the largest face from a given image
 
     Args:
-        image (Image.Image): Image object.
+        image (Image.Image | np.ndarray): Image object or decoded pixels.
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
         embed (boolean): Flag to embed the extracted face (default is False).
 
@@ -86,7 +131,8 @@ def extract_largest_face(
 
         - "embedding" (List[float]): Multidimensional vector representing facial features.
             The number of dimensions varies based on the reference model (e.g., FaceNet
-            returns 128 dimensions, VGG-Face returns 4096 dimensions).
+            returns 128 dimensions, VGG-Face returns 4096 dimensions). this key is just
+            available in the result only if embed is set to True in input arguments.
     """
     try:
         face_objs = DeepFace.extract_faces(
@@ -112,24 +158,12 @@ def extract_largest_face(
         and largest_face_obj["antispoof_score"] > settings.ANTI_SPOOF_THRESHOLD
     ):
         raise FaceSpoofingDetected("Face spoofing detected")
-    embedding = DeepFace.represent(
-        largest_face_obj["face"],
-        model_name=MODEL_NAME,
-        detector_backend="skip",
-        max_faces=1,
-    )[0]["embedding"]
-
-    largest_face_obj["embedding"] = embedding
+
     if embed:
         try:
-            embedding = DeepFace.represent(
-                largest_face_obj["face"],
-                model_name=MODEL_NAME,
-                detector_backend="skip",
-                max_faces=1,
-            )[0]["embedding"]
-
-            largest_face_obj["embedding"] = embedding
+            largest_face_obj["embedding"] = embed_face(
+                largest_face_obj["face"]
+            )
         except ValueError as e:
             logger.error(f"Error embedding face: {e}")
             return None
@@ -1,2 +1,18 @@
 class FaceSpoofingDetected(Exception):
     pass
+
+
+class InferenceQueueFull(Exception):
+    pass
+
+
+class InferenceTimeout(Exception):
+    pass
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class InvalidRefreshToken(Exception):
+    pass
@@ -0,0 +1,45 @@
+"""Delete expired auth codes and stale OAuth sessions and refresh tokens
+once, e.g. from cron when the reaper task of the app is disabled.
+
+    python -m app.utils.reap_expired [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.reaper import reaper
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser("expired OAuth rows reaper")
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.REAPER_BATCH_SIZE,
+        help="Rows per delete statement",
+    )
+    return p.parse_args()
+
+
+async def run(batch_size: int) -> None:
+    try:
+        purged = await reaper.run_once(batch_size)
+    finally:
+        await async_engine.dispose()
+    for name, count in purged.items():
+        logger.info(f"{name}: {count} rows deleted")
+
+
+def main() -> None:
+    args = parse_args()
+    asyncio.run(run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
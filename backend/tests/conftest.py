@@ -0,0 +1,53 @@
+import uuid
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.models.project import Project
+
+
+class Clock:
+    """Time source to inject instead of `time.monotonic`, moved by hand"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture()
+def db() -> Generator[Session, None, None]:
+    """Session whose commits are rolled back once the test is done"""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        transaction.rollback()
+
+
+@pytest.fixture()
+def owner_id(db: Session) -> uuid.UUID:
+    owner_id = uuid.uuid4()
+    db.execute(
+        text("INSERT INTO auth.users (id) VALUES (:id)"), {"id": owner_id}
+    )
+    return owner_id
+
+
+@pytest.fixture()
+def project(db: Session, owner_id: uuid.UUID) -> Project:
+    project = Project(name="project", owner_id=owner_id)
+    db.add(project)
+    db.commit()
+    return project
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from supabase import AuthApiError, AuthRetryableError
+
+from app.core import auth
+
+
+class FakeAuth:
+    """`get_user` of the Supabase auth client, raising `error` if set"""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.calls = 0
+
+    async def get_user(self, jwt: str) -> Any:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return None
+
+
+@pytest.fixture(autouse=True)
+def rejected_tokens() -> None:
+    auth._rejected_tokens.clear()
+
+
+def _get_user(fake_auth: FakeAuth, token: str = "token") -> Any:
+    client: Any = SimpleNamespace(auth=fake_auth)
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=token
+    )
+    return asyncio.run(auth.get_remote_user(client, credentials))
+
+
+def test_invalid_token_is_rejected_and_cached() -> None:
+    fake_auth = FakeAuth(AuthApiError("invalid JWT", 401, "bad_jwt"))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            _get_user(fake_auth)
+        assert exc_info.value.status_code == 404
+
+    # the replay is refused without asking Supabase again
+    assert fake_auth.calls == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        AuthRetryableError("Bad Gateway", 502),
+        AuthApiError("Internal Server Error", 500, "unexpected_failure"),
+        TimeoutError(),
+    ],
+)
+def test_unreachable_auth_is_not_cached(error: Exception) -> None:
+    fake_auth = FakeAuth(error)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            _get_user(fake_auth)
+        assert exc_info.value.status_code == 503
+
+    assert fake_auth.calls == 2
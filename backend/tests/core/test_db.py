@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+from sqlmodel import Session
+
+from app.core import db as db_module
+from app.crud import oauth_refresh_token, oauth_session
+from app.models.project import Project
+from app.utils.errors import InvalidRefreshToken
+
+
+@pytest.fixture(autouse=True)
+def user_data(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        db_module,
+        "get_user_data",
+        lambda user_id: {"id": str(user_id), "email": "user@example.com"},
+    )
+
+
+def test_refresh_token_is_used_once(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    token = db_module.generate_oauth_token(db, owner_id, project.id)
+    refresh_token = oauth_refresh_token.get_by_token(
+        db, token=token.refresh_token
+    )
+    session_obj = oauth_session.get(db, id=token.oauth_session_id)
+    assert refresh_token is not None
+    assert session_obj is not None
+
+    new_token = db_module.refresh_oauth_token(db, refresh_token, session_obj)
+    assert new_token.refresh_token != token.refresh_token
+
+    # e.g. a concurrent request that looked the token up before the
+    # rotation committed
+    with pytest.raises(InvalidRefreshToken):
+        db_module.refresh_oauth_token(db, refresh_token, session_obj)
+    # the rollback kept the rotated token
+    assert (
+        oauth_refresh_token.get_by_token(db, token=new_token.refresh_token)
+        is not None
+    )
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.core.frame_admission import Admission, FrameAdmission
+from tests.conftest import Clock
+
+
+def _admission(
+    max_fps: float = 0,
+    max_in_flight: int = 4,
+    hint_interval: float = 1,
+    clock: Callable[[], float] = time.monotonic,
+) -> FrameAdmission:
+    return FrameAdmission(
+        max_fps=max_fps,
+        max_in_flight=max_in_flight,
+        hint_interval=hint_interval,
+        clock=clock,
+    )
+
+
+def test_latest_frame_wins() -> None:
+    admission = _admission()
+
+    assert admission.offer("a", 1) is Admission.ADMITTED
+    assert admission.offer("a", 2) is Admission.PARKED
+    assert admission.offer("a", 3) is Admission.SUPERSEDED
+    # other clients have their own slot
+    assert admission.offer("b", 1) is Admission.ADMITTED
+
+    # frame 1 is done, the most recent parked frame is next
+    assert admission.next("a") == 3
+    assert admission.offer("a", 4) is Admission.PARKED
+    assert admission.next("a") == 4
+    assert admission.next("a") is None
+
+    # nothing in flight anymore
+    assert admission.offer("a", 5) is Admission.ADMITTED
+
+
+def test_next_unknown_client() -> None:
+    assert _admission().next("a") is None
+
+
+def test_release_after_failure() -> None:
+    admission = _admission()
+    admission.offer("a", 1)
+    admission.offer("a", 2)
+
+    admission.release("a")
+    admission.release("unknown")
+
+    assert admission.next("a") is None
+    assert admission.offer("a", 3) is Admission.ADMITTED
+
+
+def test_rate_limit(clock: Clock) -> None:
+    admission = _admission(max_fps=10, clock=clock)
+
+    assert admission.offer("a", 1) is Admission.ADMITTED
+    clock.now += 0.05
+    assert admission.offer("a", 2) is Admission.RATE_LIMITED
+    # dropped frames are not parked
+    assert admission.next("a") is None
+
+    clock.now += 0.06
+    assert admission.offer("a", 3) is Admission.ADMITTED
+    assert admission.retry_after == pytest.approx(0.1)
+
+
+def test_no_rate_limit(clock: Clock) -> None:
+    admission = _admission(max_fps=0, clock=clock)
+
+    assert admission.offer("a", 1) is Admission.ADMITTED
+    assert admission.offer("a", 2) is Admission.PARKED
+    assert admission.retry_after == 0
+
+
+def test_should_hint(clock: Clock) -> None:
+    admission = _admission(hint_interval=1, clock=clock)
+    assert admission.should_hint("a") is False
+
+    admission.offer("a", 1)
+    assert admission.should_hint("a") is True
+    assert admission.should_hint("a") is False
+
+    clock.now += 1
+    assert admission.should_hint("a") is True
+
+
+def test_processing_bounds_in_flight_frames() -> None:
+    admission = _admission(max_in_flight=2)
+    in_flight: list[int] = []
+
+    async def process() -> None:
+        async with admission.processing():
+            in_flight.append(admission.stats()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(*(process() for _ in range(5)))
+
+    asyncio.run(main())
+
+    assert max(in_flight) == 2
+    assert admission.stats()["in_flight"] == 0
+    assert admission.stats()["waited"] == 3
+
+
+def test_processing_releases_on_error() -> None:
+    admission = _admission(max_in_flight=1)
+
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            async with admission.processing():
+                raise ValueError
+        # the slot is free again
+        await asyncio.wait_for(process(), timeout=1)
+
+    async def process() -> None:
+        async with admission.processing():
+            pass
+
+    asyncio.run(main())
+
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_stats_and_remove(clock: Clock) -> None:
+    admission = _admission(max_fps=10, clock=clock)
+    admission.offer("a", 1)
+    admission.offer("a", 2)
+    clock.now += 0.1
+    admission.offer("a", 3)
+    admission.offer("b", 1)
+    clock.now += 0.1
+    admission.offer("a", 4)
+
+    admission.remove("b")
+
+    assert admission.stats() == {
+        "max_fps": 10,
+        "max_in_flight": 4,
+        "in_flight": 0,
+        "clients": 1,
+        "admitted": 2,
+        "parked": 1,
+        "superseded": 1,
+        "rate_limited": 1,
+        "waited": 0,
+    }
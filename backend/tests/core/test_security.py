@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from supabase import AuthApiError, AuthRetryableError
+
+from app.core import security
+
+
+class FakeAdmin:
+    """`get_user_by_id` of the Supabase admin API, raising `error`"""
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+        self.calls = 0
+
+    def get_user_by_id(self, uid: str) -> Any:
+        self.calls += 1
+        raise self.error
+
+
+def _fake_client(
+    monkeypatch: pytest.MonkeyPatch, error: Exception
+) -> FakeAdmin:
+    admin = FakeAdmin(error)
+    client = SimpleNamespace(auth=SimpleNamespace(admin=admin))
+    monkeypatch.setattr(security, "get_super_client", lambda: client)
+    return admin
+
+
+def test_missing_user_is_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    admin = _fake_client(
+        monkeypatch, AuthApiError("User not found", 404, "user_not_found")
+    )
+    user_id = uuid4()
+
+    assert security.get_user_data(user_id) is None
+    assert security.get_user_data(user_id) is None
+    assert admin.calls == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        AuthRetryableError("Service Unavailable", 503),
+        AuthApiError("Internal Server Error", 500, "unexpected_failure"),
+    ],
+)
+def test_failed_lookup_is_not_cached(
+    monkeypatch: pytest.MonkeyPatch, error: Exception
+) -> None:
+    admin = _fake_client(monkeypatch, error)
+    user_id = uuid4()
+
+    assert security.get_user_data(user_id) is None
+    assert security.get_user_data(user_id) is None
+    assert admin.calls == 2
@@ -0,0 +1,118 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import NamedTuple
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.crud.pagination import (
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    to_page,
+)
+from app.models.project import Project
+from app.utils.errors import InvalidCursor
+
+
+class Record(NamedTuple):
+    created_at: datetime
+    id: uuid.UUID
+
+
+def _records(count: int) -> list[Record]:
+    now = datetime.now(UTC)
+    return [
+        Record(now - timedelta(seconds=i), uuid.uuid4()) for i in range(count)
+    ]
+
+
+def test_cursor_round_trip() -> None:
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=UTC)
+    key = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, key)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor",
+        # valid base64 of text without the separator
+        "bm8tc2VwYXJhdG9y",
+        # valid base64 of a bad timestamp and key
+        "bm90LWEtZGF0ZXxub3QtYS11dWlk",
+    ],
+)
+def test_decode_cursor_invalid(cursor: str) -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_to_page_with_next_page() -> None:
+    records = _records(4)
+
+    page = to_page(records, 3, lambda record: (record.created_at, record.id))
+
+    assert page.items == records[:3]
+    assert page.next_cursor is not None
+    assert decode_cursor(page.next_cursor) == tuple(records[2])
+
+
+@pytest.mark.parametrize("count", [0, 2, 3])
+def test_to_page_last_page(count: int) -> None:
+    records = _records(count)
+
+    page = to_page(records, 3, lambda record: (record.created_at, record.id))
+
+    assert page.items == records
+    assert page.next_cursor is None
+
+
+def test_paginate_first_page() -> None:
+    statement = paginate(
+        select(Project),
+        Project.created_at,
+        Project.id,
+        cursor=None,
+        limit=10,
+    )
+    compiled = statement.compile(dialect=postgresql.dialect())
+
+    assert "WHERE" not in str(compiled)
+    assert "ORDER BY project.created_at DESC, project.id DESC" in str(compiled)
+    # one more than the limit, to tell whether there is a next page
+    assert list(compiled.params.values()) == [11]
+
+
+def test_paginate_after_cursor() -> None:
+    created_at = datetime(2026, 1, 1, tzinfo=UTC)
+    key = uuid.uuid4()
+
+    statement = paginate(
+        select(Project),
+        Project.created_at,
+        Project.id,
+        cursor=encode_cursor(created_at, key),
+        limit=10,
+    )
+    compiled = statement.compile(dialect=postgresql.dialect())
+
+    assert "WHERE (project.created_at, project.id) < (" in str(compiled)
+    assert list(compiled.params.values()) == [created_at, key, 11]
+
+
+def test_paginate_invalid_cursor() -> None:
+    with pytest.raises(InvalidCursor):
+        paginate(
+            select(Project),
+            Project.created_at,
+            Project.id,
+            cursor="not a cursor",
+            limit=10,
+        )
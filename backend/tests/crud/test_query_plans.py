@@ -0,0 +1,28 @@
+from collections.abc import Callable, Generator
+from typing import Any
+
+import pytest
+from sqlmodel import Session, text
+
+from app.crud import crud_trusted_origin
+from app.utils.check_query_plans import LOOKUPS, explain
+
+
+@pytest.fixture(autouse=True)
+def clear_origin_checks() -> Generator[None, None, None]:
+    # a cached check sends no statement to explain
+    crud_trusted_origin._origin_checks.clear()
+    yield
+    crud_trusted_origin._origin_checks.clear()
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS.values(), ids=LOOKUPS.keys())
+def test_lookup_uses_an_index(
+    db: Session, lookup: Callable[[Session], Any]
+) -> None:
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+
+    plan = explain(db, lookup)
+
+    assert plan
+    assert not any("Seq Scan" in line for line in plan), "\n".join(plan)
@@ -0,0 +1,219 @@
+import uuid
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.crud import crud_trusted_origin
+from app.crud import project as crud_project
+from app.crud.crud_trusted_origin import OriginCheck, trusted_origin
+from app.models.project import Project
+from app.models.trusted_origin import TrustedOriginCreate, TrustedOriginUpdate
+from app.utils.cache import TTLCache
+from tests.conftest import Clock
+
+ORIGIN = "https://app.example.com"
+
+
+@pytest.fixture(autouse=True)
+def clear_origin_checks() -> Generator[None, None, None]:
+    crud_trusted_origin._origin_checks.clear()
+    yield
+    crud_trusted_origin._origin_checks.clear()
+
+
+@pytest.fixture()
+def statements(db: Session) -> Generator[list[str], None, None]:
+    """SQL statements sent through `db` while the test runs, savepoints
+    included"""
+    executed: list[str] = []
+
+    def record(*args: Any) -> None:
+        executed.append(args[2])
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    yield executed
+    event.remove(connection, "before_cursor_execute", record)
+
+
+def _check(db: Session, project_id: uuid.UUID) -> OriginCheck:
+    return trusted_origin.check_origin(
+        db, project_id=project_id, origin=ORIGIN
+    )
+
+
+def test_check_origin(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+    assert (
+        trusted_origin.check_origin(
+            db, project_id=project.id, origin="https://other.example.com"
+        )
+        is OriginCheck.INVALID_ORIGIN
+    )
+    assert _check(db, uuid.uuid4()) is OriginCheck.INVALID_PROJECT
+
+
+def test_check_origin_is_cached(
+    db: Session,
+    owner_id: uuid.UUID,
+    project: Project,
+    statements: list[str],
+) -> None:
+    trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    project_id = project.id
+    statements.clear()
+
+    assert _check(db, project_id) is OriginCheck.TRUSTED
+    assert _check(db, project_id) is OriginCheck.TRUSTED
+    # one join for both, the second check is served from the cache
+    selects = [
+        statement for statement in statements if statement.startswith("SELECT")
+    ]
+    assert len(selects) == 1
+    assert "LEFT OUTER JOIN trusted_origin" in selects[0]
+
+
+def test_negative_checks_expire_sooner(
+    db: Session,
+    project: Project,
+    clock: Clock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    origin_checks: TTLCache[tuple[uuid.UUID, str], OriginCheck] = TTLCache(
+        maxsize=10, ttl=10, clock=clock
+    )
+    monkeypatch.setattr(crud_trusted_origin, "_origin_checks", origin_checks)
+    monkeypatch.setattr(settings, "TRUSTED_ORIGIN_NEGATIVE_CACHE_TTL", 1)
+    key = (project.id, ORIGIN)
+
+    assert _check(db, project.id) is OriginCheck.INVALID_ORIGIN
+    assert origin_checks.get(key) is not None
+
+    clock.now += 1
+    assert origin_checks.get(key) is None
+
+
+def test_create_invalidates(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    assert _check(db, project.id) is OriginCheck.INVALID_ORIGIN
+
+    trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+
+
+def test_update_invalidates(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    db_obj = trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+
+    trusted_origin.update(
+        db,
+        id=db_obj.id,
+        obj_in=TrustedOriginUpdate(
+            name="https://other.example.com", project_id=project.id
+        ),
+    )
+
+    assert _check(db, project.id) is OriginCheck.INVALID_ORIGIN
+
+
+def test_remove_invalidates(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    db_obj = trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+
+    trusted_origin.remove(db, id=db_obj.id)
+
+    assert _check(db, project.id) is OriginCheck.INVALID_ORIGIN
+
+
+def test_failed_write_keeps_cache(db: Session, project: Project) -> None:
+    assert _check(db, project.id) is OriginCheck.INVALID_ORIGIN
+
+    assert trusted_origin.remove(db, id=uuid.uuid4()) is None
+
+    assert len(crud_trusted_origin._origin_checks) == 1
+
+
+def test_uncommitted_write_keeps_cache(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    db_obj = trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+
+    trusted_origin.remove(db, id=db_obj.id, commit=False)
+    # other sessions still see the origin until the commit
+    assert len(crud_trusted_origin._origin_checks) == 1
+
+    db.commit()
+    assert len(crud_trusted_origin._origin_checks) == 0
+
+
+def test_rolled_back_write_keeps_cache(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    db_obj = trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    assert _check(db, project.id) is OriginCheck.TRUSTED
+
+    trusted_origin.remove(db, id=db_obj.id, commit=False)
+    db.rollback()
+    db.commit()
+
+    assert len(crud_trusted_origin._origin_checks) == 1
+
+
+def test_project_remove_invalidates(
+    db: Session, owner_id: uuid.UUID, project: Project
+) -> None:
+    trusted_origin.create(
+        db,
+        obj_in=TrustedOriginCreate(name=ORIGIN, project_id=project.id),
+        owner_id=owner_id,
+    )
+    project_id = project.id
+    assert _check(db, project_id) is OriginCheck.TRUSTED
+
+    # its trusted origins are deleted with it
+    crud_project.remove(db, id=project_id)
+
+    assert _check(db, project_id) is OriginCheck.INVALID_PROJECT
@@ -0,0 +1,104 @@
+from app.utils.cache import TTLCache
+from tests.conftest import Clock
+
+
+def test_get_set() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+
+    ttl_cache.set("a", 1)
+
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("b", 0) == 0
+    assert "a" in ttl_cache
+    assert "b" not in ttl_cache
+
+
+def test_cached_none_is_a_hit() -> None:
+    ttl_cache: TTLCache[str, int | None] = TTLCache(maxsize=2, ttl=10)
+    missing = object()
+
+    ttl_cache.set("a", None)
+
+    assert ttl_cache.get("a", missing) is None
+    assert "a" in ttl_cache
+
+
+def test_expiry(clock: Clock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, clock=clock)
+    ttl_cache.set("a", 1)
+
+    clock.now += 9.9
+    assert ttl_cache.get("a") == 1
+
+    clock.now += 0.1
+    assert ttl_cache.get("a") is None
+    # dropped once found expired
+    assert len(ttl_cache) == 0
+
+
+def test_entry_ttl(clock: Clock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, clock=clock)
+    ttl_cache.set("short", 1, ttl=1)
+    ttl_cache.set("default", 2)
+
+    clock.now += 5
+
+    assert ttl_cache.get("short") is None
+    assert ttl_cache.get("default") == 2
+
+
+def test_least_recently_used_is_evicted() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    # "a" is now more recently used than "b"
+    ttl_cache.get("a")
+
+    ttl_cache.set("c", 3)
+
+    assert len(ttl_cache) == 2
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("c") == 3
+
+
+def test_set_refreshes_entry(clock: Clock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, clock=clock)
+    ttl_cache.set("a", 1)
+
+    clock.now += 8
+    ttl_cache.set("a", 2)
+    clock.now += 8
+
+    assert ttl_cache.get("a") == 2
+
+
+def test_pop_and_clear() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=3, ttl=10)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.pop("a")
+    ttl_cache.pop("missing")
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("b") == 2
+
+    ttl_cache.clear()
+    assert len(ttl_cache) == 0
+
+
+def test_stats() -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    ttl_cache.set("a", 1)
+
+    ttl_cache.get("a")
+    ttl_cache.get("b")
+
+    assert ttl_cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "ttl": 10,
+        "hits": 1,
+        "misses": 1,
+    }